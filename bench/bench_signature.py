@@ -0,0 +1,84 @@
+"""
+Slack 서명 검증 미들웨어의 요청당 오버헤드 마이크로벤치마크
+
+네트워크/서버 없이 ASGI 호출을 직접 반복해 미들웨어 유무에 따른 차이를 측정합니다.
+
+사용 예:
+    python -m bench.bench_signature --iterations 20000 --body-bytes 512 4096 65536
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+SECRET = 'bench-signing-secret'
+os.environ.setdefault('SLACK_SIGNING_SECRET', SECRET)
+
+
+async def _inner_app(scope, receive, send):
+    # 하위 앱은 바디를 끝까지 읽기만 함 (FastAPI가 request.body()를 읽는 것과 동일한 비용)
+    more_body = True
+    while more_body:
+        message = await receive()
+        more_body = message.get('more_body', False)
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'{"ok":true}'})
+
+
+async def _measure(app, scope, chunks, iterations: int) -> float:
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        pending = iter(chunks)
+
+        async def receive():
+            return next(pending)
+
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / iterations
+
+
+def run(iterations: int, body_sizes, chunk_bytes: int) -> dict:
+    from src.slack_signature import SlackSignatureMiddleware, compute_signature
+    middleware = SlackSignatureMiddleware(_inner_app, signing_secret=SECRET)
+    results = {}
+    for size in body_sizes:
+        body = json.dumps({'type': 'event_callback', 'pad': 'x' * max(0, size - 40)}).encode('utf-8')
+        timestamp = str(int(time.time())).encode('ascii')
+        signature = compute_signature(SECRET.encode('utf-8'), timestamp, body)
+        headers = [
+            (b'content-type', b'application/json'),
+            (b'x-slack-request-timestamp', timestamp),
+            (b'x-slack-signature', signature),
+        ]
+        scope = {'type': 'http', 'method': 'POST', 'path': '/slack/event', 'headers': headers}
+        retry_scope = dict(scope, headers=headers + [(b'x-slack-retry-num', b'1')])
+        parts = [body[i:i + chunk_bytes] for i in range(0, len(body), chunk_bytes)] or [b'']
+        chunks = [{'type': 'http.request', 'body': p, 'more_body': i < len(parts) - 1} for i, p in enumerate(parts)]
+
+        baseline = asyncio.run(_measure(_inner_app, scope, chunks, iterations))
+        verified = asyncio.run(_measure(middleware, scope, chunks, iterations))
+        retry = asyncio.run(_measure(middleware, retry_scope, chunks, iterations))
+        results[len(body)] = {
+            'baseline_us': round(baseline * 1e6, 2),
+            'verified_us': round(verified * 1e6, 2),
+            'overhead_us': round((verified - baseline) * 1e6, 2),
+            'retry_ack_us': round(retry * 1e6, 2)
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Per-request overhead of SlackSignatureMiddleware')
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--body-bytes', type=int, nargs='+', default=[512, 4096, 65536])
+    parser.add_argument('--chunk-bytes', type=int, default=65536, help='ASGI receive chunk size')
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.iterations, args.body_bytes, args.chunk_bytes), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+처리 완료 상태 레코드의 구/신 포맷 크기 및 WCU 비교
+
+DynamoDB 아이템 크기 규칙으로 한 번의 폴링에서 쓰는 아이템들의 바이트 수와 WCU를 계산합니다.
+
+사용 예:
+    python -m bench.bench_state_format --messages-per-poll 20 --positive-ratio 0.2
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from src.state_format import (
+    RECORD_TTL_SECONDS, LEGACY_KEY_ATTR, encode_record, decode_record, item_size, write_units, message_digest
+)
+
+SAMPLE_TEXTS = [
+    '결제 완료 후에 재매칭권이 차감되지 않는 문제가 있는 것 같아요. 포트원 웹훅 로그 확인 부탁드립니다.',
+    '어드민에서 학교 인증 승인 버튼을 눌러도 상태가 바뀌지 않습니다. 새로고침하면 다시 대기 상태로 보여요.',
+    '오늘 점심 뭐 먹을까요?',
+    '매칭 결과 알림 메일이 두 번씩 발송되고 있습니다. 스케줄러가 중복 실행되는 것 같습니다.',
+    '넵 확인했습니다!',
+]
+
+DESCRIPTION_TEMPLATE = (
+    '## 문제 상황\n결제 완료 후 재매칭권이 차감되지 않아 사용자가 무료로 재매칭을 반복할 수 있음\n'
+    '## 재현 방법\n1. 재매칭권 결제\n2. 재매칭 요청\n3. 보유 재매칭권 확인\n'
+    '## 기대 결과\n재매칭 요청 시 재매칭권이 1개 차감되어야 함\n'
+)
+
+
+def encode_legacy_record(message_hash: str, message_data: Dict, now: Optional[float] = None) -> Dict:
+    """기존 포맷 아이템을 생성합니다. (크기 비교용, 앱은 더 이상 이 포맷으로 쓰지 않음)"""
+    now = time.time() if now is None else now
+    return {
+        LEGACY_KEY_ATTR: message_hash,
+        'processed_at': datetime.fromtimestamp(now).isoformat(),
+        'message_data': json.dumps(message_data, ensure_ascii=False),
+        'ttl': int(now + RECORD_TTL_SECONDS)
+    }
+
+
+def sample_analysis(positive: bool, description_chars: int) -> dict:
+    return {
+        'need_ticket': positive,
+        'confidence': 0.92 if positive else 0.2,
+        'reasoning': '사용자가 결제 이후 재매칭권 차감 누락을 보고했으며 서비스 데이터 무결성에 영향을 주는 버그로 판단됩니다.'
+        if positive else '일상 대화로 티켓 생성이 필요하지 않습니다.',
+        'ticket_info': {
+            'summary': '[버그] 결제 후 재매칭권 차감 누락',
+            # 프롬프트 템플릿(문제/재현/기대 결과)을 채운 설명은 보통 수백 자 분량
+            'description': (DESCRIPTION_TEMPLATE * (description_chars // len(DESCRIPTION_TEMPLATE) + 1))[:description_chars],
+            'issue_type': '버그',
+            'priority': 'High',
+            'assignee': '최은기'
+        } if positive else None
+    }
+
+
+def run(messages_per_poll: int, positive_ratio: float, description_chars: int = 300, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    now = time.time()
+    legacy_bytes = compact_bytes = legacy_wcu = compact_wcu = 0
+    for i in range(messages_per_poll):
+        message = {'user': f'U0{i % 4}', 'text': rng.choice(SAMPLE_TEXTS), 'ts': f'{now + i:.6f}'}
+        analysis = sample_analysis(rng.random() < positive_ratio, description_chars)
+        digest = message_digest(message)
+        legacy = encode_legacy_record(digest.hex(), {
+            'user': f'벤치 사용자 {i % 4}',
+            'text': message['text'],
+            'analysis': analysis
+        }, now)
+        compact = encode_record(digest, analysis, now)
+        # 신규 포맷도 구 포맷과 같은 해시/분석으로 복원되는지 확인
+        decoded = decode_record(compact)
+        assert decoded['message_hash'] == legacy['message_hash']
+        assert decoded['analysis'] == (analysis if analysis['need_ticket'] else None)
+        assert decode_record(legacy)['analysis'] == analysis
+        legacy_bytes += item_size(legacy)
+        compact_bytes += item_size(compact)
+        legacy_wcu += write_units(legacy)
+        compact_wcu += write_units(compact)
+    return {
+        'messages_per_poll': messages_per_poll,
+        'positive_ratio': positive_ratio,
+        'description_chars': description_chars,
+        'legacy': {'bytes': legacy_bytes, 'wcu': legacy_wcu},
+        'compact': {'bytes': compact_bytes, 'wcu': compact_wcu},
+        'bytes_reduction': round(1 - compact_bytes / legacy_bytes, 3) if legacy_bytes else 0.0,
+        'wcu_reduction': round(1 - compact_wcu / legacy_wcu, 3) if legacy_wcu else 0.0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Processed-message record size: legacy vs compact format')
+    parser.add_argument('--messages-per-poll', type=int, default=20)
+    parser.add_argument('--positive-ratio', type=float, default=0.2)
+    parser.add_argument('--description-chars', type=int, default=300, help='length of ticket descriptions in analyses')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.messages_per_poll, args.positive_ratio, args.description_chars, args.seed), indent=2))
+
+
+if __name__ == '__main__':
+    main()
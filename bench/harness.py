@@ -0,0 +1,306 @@
+"""
+벤치마크 실행 환경 및 부하 발생기
+
+스텁 서버를 띄우고 환경변수를 스텁 주소로 맞춘 뒤 src.main을 임포트해야 하므로
+src 모듈 임포트는 BenchEnvironment.start() 안에서만 수행합니다.
+"""
+import json
+import math
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from .stubs import SlackStub, OpenAIStub, JiraStub
+
+AWS_REGION = 'ap-northeast-2'
+CHANNEL_ID = 'CBENCH'
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """정렬된 값에서 nearest-rank 방식으로 백분위수를 구합니다."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int) -> Dict:
+    """지연 시간 목록(초)을 p50/p95/p99(밀리초)와 처리량으로 요약합니다."""
+    values = sorted(latencies)
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'throughput_rps': round(len(values) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if values else 0.0
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class BenchEnvironment:
+    def __init__(self, slack_latency_ms: float = 0.0, openai_latency_ms: float = 0.0,
+                 jira_latency_ms: float = 0.0, openai_output_tokens: int = 50,
+                 messages_per_poll: int = 5, thread_replies: int = 5,
+                 channels: int = 1, channel_concurrency: int = 2):
+        """
+        스텁 서버, moto DynamoDB, 로컬 uvicorn 서버로 구성된 오프라인 실행 환경
+
+        Args:
+            channels: 라우팅할 채널 수 (2 이상이면 CHANNEL_ROUTES로 채널별 파티션 구성)
+            channel_concurrency: 채널별 워커 수
+        """
+        self.channel_ids = [CHANNEL_ID] if channels <= 1 else [f'{CHANNEL_ID}{i}' for i in range(channels)]
+        self.channel_concurrency = channel_concurrency
+        self.slack = SlackStub(slack_latency_ms, messages_per_poll, thread_replies)
+        self.openai = OpenAIStub(openai_latency_ms, openai_output_tokens)
+        self.jira = JiraStub(jira_latency_ms)
+        self.signing_secret = 'bench-signing-secret'
+        self.main = None
+        self.base_url: Optional[str] = None
+        self._mock = None
+        self._server = None
+        self._server_thread: Optional[threading.Thread] = None
+        self.server_loop = None
+
+    def start(self) -> 'BenchEnvironment':
+        for stub in (self.slack, self.openai, self.jira):
+            stub.start()
+        os.environ.update({
+            'SLACK_BOT_TOKEN': 'xoxb-bench',
+            'SLACK_SIGNING_SECRET': self.signing_secret,
+            'SLACK_CHANNEL_ID': self.channel_ids[0],
+            'CHANNEL_ROUTES': json.dumps({c: {'jira_project_key': 'SOM'} for c in self.channel_ids}),
+            'CHANNEL_CONCURRENCY': str(self.channel_concurrency),
+            'SLACK_API_URL': f'{self.slack.url}/api/',
+            'OPENAI_API_KEY': 'sk-bench',
+            'OPENAI_BASE_URL': f'{self.openai.url}/v1',
+            'JIRA_SERVER': self.jira.url,
+            'JIRA_USER': 'bench',
+            'JIRA_API_TOKEN': 'bench',
+            'JIRA_PROJECT_KEY': 'SOM',
+            'AWS_REGION': AWS_REGION,
+            'AWS_DEFAULT_REGION': AWS_REGION,
+            'AWS_ACCESS_KEY_ID': 'bench',
+            'AWS_SECRET_ACCESS_KEY': 'bench',
+            'SCHEDULER_ENABLED': 'false',
+            'LOG_LEVEL': os.environ.get('BENCH_LOG_LEVEL', 'WARNING'),
+        })
+        for name in ('REDIS_URL', 'CHANNEL_ROUTES_PATH'):
+            os.environ.pop(name, None)
+
+        from moto import mock_aws
+        self._mock = mock_aws()
+        self._mock.start()
+        self._create_tables()
+
+        from src import main
+        self.main = main
+
+        import asyncio
+        import uvicorn
+        # 프로파일러 등이 서버 스레드에서 코드를 실행할 수 있도록 이벤트 루프를 보관
+        main.app.router.on_startup.append(lambda: setattr(self, 'server_loop', asyncio.get_running_loop()))
+        port = _free_port()
+        self._server = uvicorn.Server(uvicorn.Config(main.app, host='127.0.0.1', port=port, log_level='warning'))
+        self._server_thread = threading.Thread(target=self._server.run, daemon=True)
+        self._server_thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        self.base_url = f'http://127.0.0.1:{port}'
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.should_exit = True
+            self._server_thread.join(timeout=5)
+        for stub in (self.slack, self.openai, self.jira):
+            stub.stop()
+        if self._mock:
+            self._mock.stop()
+
+    def _create_tables(self):
+        import boto3
+        from src.config import config
+        dynamodb = boto3.client('dynamodb', region_name=AWS_REGION)
+        dynamodb.create_table(
+            TableName=config.DYNAMODB_TABLE_NAME,
+            KeySchema=[{'AttributeName': 'message_hash', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'message_hash', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        dynamodb.create_table(
+            TableName=config.DYNAMODB_STATE_TABLE_NAME,
+            KeySchema=[{'AttributeName': 'h', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'h', 'AttributeType': 'B'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        dynamodb.create_table(
+            TableName=config.SCHEDULER_LEASE_TABLE_NAME,
+            KeySchema=[{'AttributeName': 'lease_name', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'lease_name', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+    def upstream_calls(self) -> Dict[str, Dict[str, int]]:
+        return {
+            'slack': self.slack.call_counts(),
+            'openai': self.openai.call_counts(),
+            'jira': self.jira.call_counts()
+        }
+
+    # 요청 생성기 -------------------------------------------------------------
+
+    def event_request(self, i: int) -> Dict:
+        ts = f'{time.time():.6f}'
+        body = {
+            'type': 'event_callback',
+            'event_id': f'EvBENCH{i:08d}',
+            'event': {
+                'type': 'app_mention',
+                'user': 'U1',
+                'text': '<@UBOT> 이거 티켓 필요할까요?',
+                'ts': ts,
+                'channel': self.channel_ids[i % len(self.channel_ids)]
+            }
+        }
+        return self.signed('/slack/event', json.dumps(body).encode('utf-8'), 'application/json')
+
+    def retry_event_request(self, i: int) -> Dict:
+        request = self.event_request(i)
+        request['headers'].update({'X-Slack-Retry-Num': '1', 'X-Slack-Retry-Reason': 'http_timeout'})
+        return request
+
+    def interaction_request(self, i: int) -> Dict:
+        from urllib.parse import urlencode
+        ticket_info = {
+            'summary': f'벤치 티켓 {i}',
+            'description': '벤치마크로 생성된 티켓',
+            'issue_type': '버그',
+            'priority': 'High',
+            'assignee': '최은기'
+        }
+        payload = {
+            'type': 'block_actions',
+            'user': {'id': 'U1'},
+            'channel': {'id': self.channel_ids[i % len(self.channel_ids)]},
+            'message': {'ts': f'{time.time():.6f}'},
+            'actions': [{'action_id': 'create_ticket', 'value': json.dumps(ticket_info, ensure_ascii=False)}]
+        }
+        content = urlencode({'payload': json.dumps(payload, ensure_ascii=False)}).encode('utf-8')
+        return self.signed('/slack/interactions', content, 'application/x-www-form-urlencoded')
+
+    def signed(self, path: str, content: bytes, content_type: str) -> Dict:
+        """Slack과 같은 방식으로 서명 헤더를 붙인 요청을 만듭니다."""
+        from src.slack_signature import compute_signature
+        timestamp = str(int(time.time())).encode('ascii')
+        signature = compute_signature(self.signing_secret.encode('utf-8'), timestamp, content)
+        return {
+            'path': path,
+            'content': content,
+            'headers': {
+                'Content-Type': content_type,
+                'X-Slack-Request-Timestamp': timestamp.decode('ascii'),
+                'X-Slack-Signature': signature.decode('ascii')
+            }
+        }
+
+
+def drive_http(env: BenchEnvironment, make_request: Callable[[int], Dict],
+               rate: float, duration: float, concurrency: int = 32) -> Dict:
+    """
+    고정 도착률(open-loop)로 HTTP 요청을 보내고 ack 지연 시간을 측정합니다.
+
+    Args:
+        make_request: 요청 번호를 받아 path/content/headers를 돌려주는 함수
+        rate: 초당 요청 수
+        duration: 측정 시간 (초)
+        concurrency: 동시에 보낼 수 있는 최대 요청 수
+    """
+    import httpx
+    total = max(1, int(rate * duration))
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    client = httpx.Client(base_url=env.base_url, timeout=30)
+
+    def send(i: int):
+        request = make_request(i)
+        started = time.perf_counter()
+        try:
+            response = client.post(request['path'], content=request['content'], headers=request['headers'])
+            ok = response.status_code == 200
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(total):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, i)
+    elapsed = time.perf_counter() - start
+    client.close()
+    return summarize(latencies, elapsed, errors[0])
+
+
+def drive_polls(env: BenchEnvironment, iterations: int, rate: float = 0.0) -> Dict:
+    """
+    process_messages를 실행하며 1회 실행 시간을 측정합니다.
+
+    Args:
+        iterations: 폴링 틱 수
+        rate: 초당 폴링 수 (0이면 쉬지 않고 연속 실행)
+            스케줄러처럼 실행이 겹치지 않으며, 이전 실행이 다음 틱을 넘기면 그 틱은 건너뜁니다.
+    """
+    latencies: List[float] = []
+    errors = 0
+    processed = 0
+    skipped_ticks = 0
+    start = time.perf_counter()
+    for i in range(iterations):
+        if rate > 0:
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif -delay >= 1 / rate:
+                # 스케줄러의 max_instances=1 / coalesce와 같이 밀린 틱은 실행하지 않음
+                skipped_ticks += 1
+                continue
+        started = time.perf_counter()
+        try:
+            result = env.main.process_messages()
+            processed += result.get('processed', 0)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+    summary = summarize(latencies, time.perf_counter() - start, errors)
+    summary['messages_processed'] = processed
+    summary['skipped_ticks'] = skipped_ticks
+    return summary
+
+
+def wait_for_background(env: BenchEnvironment, expected: Dict[str, Dict[str, int]], timeout: float = 30.0) -> bool:
+    """ack 이후 백그라운드 작업이 스텁에 도달할 때까지 기다립니다. (예: {'slack': {'chat.postMessage': n}})"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        calls = env.upstream_calls()
+        if all(calls[upstream].get(endpoint, 0) >= count
+               for upstream, endpoints in expected.items() for endpoint, count in endpoints.items()):
+            return True
+        time.sleep(0.05)
+    return False
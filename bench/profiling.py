@@ -0,0 +1,233 @@
+"""
+리플레이용 프로파일러
+
+- CProfileCollector: 모든 스레드(uvicorn, 채널 워커)의 cProfile 결과를 합쳐 pstats로 저장
+- SamplingProfiler: sys._current_frames()로 주기적으로 스택을 샘플링해
+  flamegraph.pl / speedscope / inferno에서 읽을 수 있는 folded stack 포맷으로 저장
+"""
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# 작업 대기 중인 스레드의 스택은 핫패스가 아니므로 샘플에서 제외
+IDLE_LEAVES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('queue.py', 'get'),
+    ('selectors.py', 'select'),
+    ('socketserver.py', 'serve_forever'),
+}
+
+
+# 스텁 서버와 리플레이 클라이언트 스레드는 측정 대상(앱)이 아니므로 샘플에서 제외
+HARNESS_FRAMES = re.compile(r'(^|/)(socketserver\.py|bench/)')
+
+_CWD = os.getcwd()
+
+
+def _display_path(filename: str) -> str:
+    # 프로젝트 안의 파일은 src/main.py처럼 상대 경로로, 나머지는 파일 이름만 표시
+    if filename.startswith(_CWD + os.sep):
+        return os.path.relpath(filename, _CWD)
+    return os.path.basename(filename)
+
+
+def _frame_label(code) -> str:
+    return f"{_display_path(code.co_filename)}:{code.co_name}:{code.co_firstlineno}"
+
+
+def _relative_stats(stats: pstats.Stats) -> pstats.Stats:
+    """
+    pstats의 파일 경로를 샘플링 리포트와 같은 표시 경로로 바꿉니다. (pstats.Stats.strip_dirs와 같은 방식)
+    --focus '^src/' 같은 정규식이 두 프로파일러에서 똑같이 동작하도록 하기 위함입니다.
+    """
+    def relabel(func):
+        filename, line, name = func
+        return (_display_path(filename), line, name) if filename.startswith(os.sep) else func
+
+    stats.stats = {
+        relabel(func): (cc, nc, tt, ct, {relabel(caller): value for caller, value in callers.items()})
+        for func, (cc, nc, tt, ct, callers) in stats.stats.items()
+    }
+    stats.top_level = {relabel(func) for func in stats.top_level}
+    stats.max_name_len = max((len(pstats.func_std_string(func)) for func in stats.stats), default=0)
+    stats.fcn_list = None
+    stats.all_callees = None
+    return stats
+
+
+class CProfileCollector:
+    def __init__(self):
+        """시작 이후 생성되는 모든 스레드에 cProfile을 붙입니다."""
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_profile: Optional[cProfile.Profile] = None
+
+    def _new_profile(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        return profile
+
+    def _thread_hook(self, frame, event, arg):
+        # 새 스레드의 첫 이벤트에서 스레드 전용 프로파일러로 교체
+        sys.setprofile(None)
+        self._new_profile().enable()
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Args:
+            loop: 이미 실행 중인 서버 이벤트 루프 (해당 스레드에도 프로파일러를 붙임)
+        """
+        self._loop = loop
+        if sys.version_info >= (3, 12):
+            # 3.12+ cProfile은 sys.monitoring 기반이라 인터프리터 전체에서 하나만 활성화할 수 있고
+            # 하나로 모든 스레드를 관측함
+            self._new_profile().enable()
+            return
+        threading.setprofile(self._thread_hook)
+        self._new_profile().enable()
+        if loop is not None:
+            self._loop_profile = self._new_profile()
+            self._run_in_loop(self._loop_profile.enable)
+
+    def stop(self):
+        if sys.version_info < (3, 12):
+            threading.setprofile(None)
+            if self._loop is not None:
+                self._run_in_loop(self._loop_profile.disable)
+        # 다른 스레드의 프로파일러는 해당 스레드에서만 끌 수 있으므로, 이 시점에는 유휴 상태여야 함
+        for profile in self.profiles:
+            profile.disable()
+
+    def _run_in_loop(self, fn):
+        async def call():
+            fn()
+        asyncio.run_coroutine_threadsafe(call(), self._loop).result()
+
+    def stats(self) -> pstats.Stats:
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profiles[0], stream=stream)
+        for profile in self.profiles[1:]:
+            try:
+                stats.add(profile)
+            except TypeError:
+                # 아무 함수도 기록하지 않은 스레드
+                continue
+        return stats
+
+    def write(self, prefix: str, top: int = 40, path_filter: Optional[str] = None) -> Dict[str, str]:
+        """
+        <prefix>.prof (pstats 덤프, 절대 경로)와 <prefix>.txt (핫패스 리포트)를 저장합니다.
+        리포트와 path_filter는 샘플링 프로파일러와 같은 상대 경로(src/main.py 등) 기준입니다.
+        """
+        stats = self.stats()
+        stats.dump_stats(f"{prefix}.prof")
+        stats = _relative_stats(stats)
+        stream = io.StringIO()
+        stats.stream = stream
+        restrictions = [path_filter] if path_filter else []
+        stream.write(f"=== top {top} by cumulative time ===\n")
+        stats.sort_stats('cumulative').print_stats(*restrictions, top)
+        stream.write(f"\n=== top {top} by own time ===\n")
+        stats.sort_stats('tottime').print_stats(*restrictions, top)
+        with open(f"{prefix}.txt", 'w', encoding='utf-8') as f:
+            f.write(stream.getvalue())
+        return {'pstats': f"{prefix}.prof", 'report': f"{prefix}.txt"}
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005, include_idle: bool = False, include_harness: bool = False):
+        """
+        Args:
+            interval: 샘플링 주기 (초)
+            include_idle: 대기 중인 스레드 스택도 기록할지 여부
+            include_harness: 스텁 서버/리플레이 클라이언트 스레드 스택도 기록할지 여부
+        """
+        self.interval = interval
+        self.include_idle = include_idle
+        self.include_harness = include_harness
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        main_id = threading.main_thread().ident
+        while not self._stop.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in (own_id, main_id):
+                    continue
+                stack = self._stack(frame)
+                if stack:
+                    self.stacks[stack] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+    def _stack(self, frame) -> Optional[Tuple[str, ...]]:
+        leaf = frame.f_code
+        if not self.include_idle and (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES:
+            return None
+        labels = []
+        while frame is not None:
+            label = _frame_label(frame.f_code)
+            if not self.include_harness and HARNESS_FRAMES.search(label):
+                return None
+            labels.append(label)
+            frame = frame.f_back
+        return tuple(reversed(labels))
+
+    def hot_functions(self, top: Optional[int] = 40) -> List[Dict]:
+        """함수별 self/total 샘플 수를 total 기준으로 정렬해 반환합니다."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                total[label] += count
+        all_samples = sum(self.stacks.values()) or 1
+        return [
+            {
+                'function': label,
+                'total_samples': count,
+                'total_pct': round(100 * count / all_samples, 1),
+                'self_samples': own.get(label, 0),
+                'self_pct': round(100 * own.get(label, 0) / all_samples, 1)
+            }
+            for label, count in total.most_common(top)
+        ]
+
+    def write(self, prefix: str, top: int = 40, path_filter: Optional[str] = None) -> Dict[str, str]:
+        """<prefix>.folded (folded stack)와 <prefix>.txt (핫패스 리포트)를 저장합니다."""
+        with open(f"{prefix}.folded", 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+        rows = self.hot_functions(top=None)
+        if path_filter:
+            rows = [r for r in rows if re.search(path_filter, r['function'])]
+        rows = rows[:top]
+        with open(f"{prefix}.txt", 'w', encoding='utf-8') as f:
+            f.write(f"samples={sum(self.stacks.values())} ticks={self.samples} interval={self.interval}s\n")
+            f.write(f"{'total%':>7} {'self%':>7}  function\n")
+            for row in rows:
+                f.write(f"{row['total_pct']:>7} {row['self_pct']:>7}  {row['function']}\n")
+        return {'folded': f"{prefix}.folded", 'report': f"{prefix}.txt"}
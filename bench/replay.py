@@ -0,0 +1,208 @@
+"""
+캡처된 Slack 트래픽 리플레이 / 프로파일링 CLI
+
+로컬 스텁(Slack/OpenAI/Jira)과 moto DynamoDB 위에 앱을 띄우고, 기록된 이벤트/인터랙션 payload를
+기록된 간격(또는 --speed 배속)으로 서명해서 다시 보냅니다. 선택적으로 cProfile 또는
+샘플링 프로파일러를 켜고 함수별 핫패스 리포트를 남깁니다.
+
+캡처 파일 형식 (JSON Lines, 한 줄에 요청 하나):
+    {"ts": 1718000000.12, "kind": "event", "body": {"type": "event_callback", "event_id": "...", "event": {...}}}
+    {"ts": 1718000001.50, "kind": "interaction", "payload": {"type": "block_actions", "actions": [...], ...}}
+kind가 없으면 내용으로 추론하며, 어느 쪽도 아닌 줄은 건너뜁니다.
+
+사용 예:
+    python -m bench.replay bench/captures/sample.jsonl --speed 10
+    python -m bench.replay capture.jsonl --speed 0 --profiler sample --profile-out /tmp/replay --focus '^src/'
+    flamegraph.pl /tmp/replay.folded > replay.svg   # 또는 speedscope /tmp/replay.folded
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+from .harness import BenchEnvironment, summarize
+from .profiling import CProfileCollector, SamplingProfiler
+
+EVENT_TYPES = {'event_callback', 'url_verification'}
+INTERACTION_TYPES = {'block_actions', 'view_submission', 'view_closed', 'shortcut', 'message_action'}
+
+
+def classify(record: Dict) -> Tuple[Optional[str], Optional[Dict]]:
+    """캡처 레코드를 ('event'|'interaction', payload)로 분류합니다. 알 수 없으면 (None, None)."""
+    kind = record.get('kind')
+    if kind == 'event':
+        return kind, record.get('body')
+    if kind == 'interaction':
+        payload = record.get('payload') or record.get('body')
+        return kind, json.loads(payload) if isinstance(payload, str) else payload
+    if record.get('type') in EVENT_TYPES:
+        return 'event', record
+    if record.get('type') in INTERACTION_TYPES:
+        return 'interaction', record
+    return None, None
+
+
+def load_capture(path: str) -> Tuple[List[Tuple[Optional[float], str, Dict]], int]:
+    """캡처 파일을 읽어 (기록 시각, 종류, payload) 목록과 건너뛴 줄 수를 반환합니다."""
+    entries = []
+    skipped = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            kind, payload = classify(record) if isinstance(record, dict) else (None, None)
+            if kind is None or not payload:
+                skipped += 1
+                continue
+            entries.append((record.get('ts'), kind, payload))
+    return entries, skipped
+
+
+def build_request(env: BenchEnvironment, kind: str, payload: Dict) -> Dict:
+    if kind == 'event':
+        return env.signed('/slack/event', json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json')
+    content = urlencode({'payload': json.dumps(payload, ensure_ascii=False)}).encode('utf-8')
+    return env.signed('/slack/interactions', content, 'application/x-www-form-urlencoded')
+
+
+def wait_for_idle(env: BenchEnvironment, timeout: float = 60.0) -> bool:
+    """채널 워커 큐가 모두 빌 때까지 기다립니다."""
+    deadline = time.monotonic() + timeout
+    idle_checks = 0
+    while time.monotonic() < deadline:
+        idle_checks = idle_checks + 1 if not any(env.main.channel_workers.pending().values()) else 0
+        if idle_checks >= 3:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def with_loop_suffix(kind: str, payload: Dict, loop: int) -> Dict:
+    """반복 재생 시 이벤트 중복 제거에 걸리지 않도록 event_id에 회차를 붙입니다."""
+    if loop == 0 or kind != 'event' or 'event_id' not in payload:
+        return payload
+    return dict(payload, event_id=f"{payload['event_id']}-L{loop}")
+
+
+def replay(env: BenchEnvironment, entries, speed: float, concurrency: int, loop: int = 0) -> Dict:
+    """기록 간격을 speed 배속으로 유지하며 요청을 보냅니다. (speed <= 0이면 최대 속도)"""
+    import httpx
+    latencies: Dict[str, List[float]] = {'event': [], 'interaction': []}
+    errors = {'event': 0, 'interaction': 0}
+    lock = threading.Lock()
+    client = httpx.Client(base_url=env.base_url, timeout=30)
+    first_ts = next((ts for ts, _, _ in entries if ts is not None), None)
+
+    def send(kind: str, request: Dict):
+        started = time.perf_counter()
+        try:
+            ok = client.post(request['path'], content=request['content'], headers=request['headers']).status_code == 200
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies[kind].append(elapsed)
+            if not ok:
+                errors[kind] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for ts, kind, payload in entries:
+            if speed > 0 and ts is not None and first_ts is not None:
+                delay = start + (ts - first_ts) / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            # 서명 타임스탬프는 전송 시점 기준으로 다시 계산
+            pool.submit(send, kind, build_request(env, kind, with_loop_suffix(kind, payload, loop)))
+    elapsed = time.perf_counter() - start
+    client.close()
+    return {kind: summarize(values, elapsed, errors[kind]) for kind, values in latencies.items() if values}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Replay captured Slack traffic against local stubs, optionally profiled')
+    parser.add_argument('capture', help='JSON Lines capture file')
+    parser.add_argument('--speed', type=float, default=1.0, help='1 = recorded pace, 10 = 10x faster, 0 = as fast as possible')
+    parser.add_argument('--loops', type=int, default=1, help='replay the capture this many times')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--channels', type=int, default=1, help='routed channels (recorded channels fall back to the default route)')
+    parser.add_argument('--slack-latency-ms', type=float, default=0.0)
+    parser.add_argument('--openai-latency-ms', type=float, default=0.0)
+    parser.add_argument('--openai-output-tokens', type=int, default=50)
+    parser.add_argument('--jira-latency-ms', type=float, default=0.0)
+    parser.add_argument('--thread-replies', type=int, default=5)
+    parser.add_argument('--profiler', choices=['none', 'cprofile', 'sample'], default='none')
+    parser.add_argument('--sample-interval-ms', type=float, default=5.0)
+    parser.add_argument('--include-harness', action='store_true', help='also sample stub server and replay client threads')
+    parser.add_argument('--profile-out', default='replay_profile', help='output path prefix for profile files')
+    parser.add_argument('--focus', help='regex restricting the hot-path report (e.g. "^src/" or "slack_client")')
+    parser.add_argument('--top', type=int, default=40)
+    parser.add_argument('--output', help='write JSON summary to this path')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    entries, skipped = load_capture(args.capture)
+    if not entries:
+        print(f"No replayable Slack events or interactions in {args.capture} (skipped {skipped} lines)", file=sys.stderr)
+        return 1
+
+    env = BenchEnvironment(
+        slack_latency_ms=args.slack_latency_ms,
+        openai_latency_ms=args.openai_latency_ms,
+        jira_latency_ms=args.jira_latency_ms,
+        openai_output_tokens=args.openai_output_tokens,
+        thread_replies=args.thread_replies,
+        channels=args.channels
+    ).start()
+    profiler = None
+    if args.profiler == 'cprofile':
+        profiler = CProfileCollector()
+        profiler.start(loop=env.server_loop)
+    elif args.profiler == 'sample':
+        profiler = SamplingProfiler(interval=args.sample_interval_ms / 1000, include_harness=args.include_harness)
+        profiler.start()
+
+    try:
+        started = time.time()
+        loops = []
+        for loop in range(args.loops):
+            loops.append(replay(env, entries, args.speed, args.concurrency, loop))
+        background_complete = wait_for_idle(env)
+        wall_seconds = round(time.time() - started, 2)
+        if profiler:
+            profiler.stop()
+        summary = {
+            'capture': args.capture,
+            'requests': len(entries) * args.loops,
+            'skipped_lines': skipped,
+            'speed': args.speed,
+            'wall_seconds': wall_seconds,
+            'background_complete': background_complete,
+            'loops': loops,
+            'upstream_calls': env.upstream_calls()
+        }
+        if profiler:
+            summary['profile'] = profiler.write(args.profile_out, top=args.top, path_filter=args.focus)
+    finally:
+        env.stop()
+
+    output = json.dumps(summary, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+오프라인 부하/벤치마크 실행 CLI
+
+사용 예:
+    python -m bench.run --rate 20 --duration 10 --openai-latency-ms 200 --output bench_output.json
+    python -m bench.run --scenarios poll --poll-rate 2 --poll-iterations 40 --channels 4
+
+CI 회귀 검사 (tests/test_bench_smoke.py가 같은 명령을 실행):
+    python -m bench.run --duration 1 --poll-iterations 2 --baseline bench/baseline.json
+
+검사는 결정적인 요청당 업스트림 호출 수(엔드포인트별)를 기준으로 하며, 지연 시간은 공유 러너의 흔들림을
+고려해 상대 허용치와 절대 허용치(--latency-floor-ms)를 모두 넘는 경우만 실패로 봅니다.
+기준 결과 갱신:
+    python -m bench.run --duration 1 --poll-iterations 2 --output bench/baseline.json
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Dict, List
+from .harness import BenchEnvironment, drive_http, drive_polls, wait_for_background
+
+SCENARIOS = ('event', 'retry', 'interaction', 'poll')
+
+
+def _diff_calls(before: Dict[str, Dict[str, int]], after: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    return {
+        upstream: {k: v - before[upstream].get(k, 0) for k, v in endpoints.items() if v - before[upstream].get(k, 0)}
+        for upstream, endpoints in after.items()
+    }
+
+
+def run(args) -> Dict:
+    env = BenchEnvironment(
+        slack_latency_ms=args.slack_latency_ms,
+        openai_latency_ms=args.openai_latency_ms,
+        jira_latency_ms=args.jira_latency_ms,
+        openai_output_tokens=args.openai_output_tokens,
+        messages_per_poll=args.messages_per_poll,
+        thread_replies=args.thread_replies,
+        channels=args.channels,
+        channel_concurrency=args.channel_concurrency
+    ).start()
+    results = {'config': vars(args).copy(), 'scenarios': {}}
+    results['config'].pop('baseline', None)
+    try:
+        for scenario in args.scenarios:
+            before = env.upstream_calls()
+            if scenario == 'event':
+                summary = drive_http(env, env.event_request, args.rate, args.duration, args.concurrency)
+                # ack 이후 백그라운드 분석이 끝나야 업스트림 호출 수가 확정됨
+                summary['background_complete'] = wait_for_background(
+                    env, {'slack': {'chat.postMessage': before['slack'].get('chat.postMessage', 0) + summary['requests']}}
+                )
+            elif scenario == 'retry':
+                # 재시도는 미들웨어에서 즉시 ack되어야 하므로 업스트림 호출이 없어야 함
+                summary = drive_http(env, env.retry_event_request, args.rate, args.duration, args.concurrency)
+            elif scenario == 'interaction':
+                summary = drive_http(env, env.interaction_request, args.rate, args.duration, args.concurrency)
+                summary['background_complete'] = wait_for_background(
+                    env, {'slack': {'chat.update': before['slack'].get('chat.update', 0) + summary['requests']}}
+                )
+            else:
+                summary = drive_polls(env, args.poll_iterations, args.poll_rate)
+            summary['upstream_calls'] = _diff_calls(before, env.upstream_calls())
+            results['scenarios'][scenario] = summary
+    finally:
+        env.stop()
+    return results
+
+
+def _calls_per_request(summary: Dict) -> Dict[str, float]:
+    requests = max(1, summary['requests'])
+    return {
+        f"{upstream}:{endpoint}": count / requests
+        for upstream, endpoints in summary['upstream_calls'].items() for endpoint, count in endpoints.items()
+    }
+
+
+def check_regressions(results: Dict, baseline: Dict, max_regression: float,
+                      max_call_regression: float = 0.1, latency_floor_ms: float = 250.0) -> List[str]:
+    """
+    기준 결과 대비 회귀 항목을 반환합니다.
+
+    - 오류가 있거나 백그라운드 작업이 끝나지 않은 시나리오
+    - 엔드포인트별 요청당 업스트림 호출 수가 max_call_regression 이상 늘어난 경우 (기준에 없던 호출 포함)
+    - p95가 기준 대비 max_regression 비율과 latency_floor_ms를 모두 넘게 늘어난 경우
+    """
+    failures = []
+    for scenario, summary in results['scenarios'].items():
+        if summary['errors']:
+            failures.append(f"{scenario}: {summary['errors']} failed requests")
+        if summary.get('background_complete') is False:
+            failures.append(f"{scenario}: background work did not complete")
+        base = baseline.get('scenarios', {}).get(scenario)
+        if not base:
+            continue
+        base_calls = _calls_per_request(base)
+        for endpoint, per_request in _calls_per_request(summary).items():
+            allowed = base_calls.get(endpoint, 0.0) * (1 + max_call_regression)
+            if per_request > allowed + 1e-9:
+                failures.append(
+                    f"{scenario}: {endpoint} calls/request {per_request:.2f} > baseline {base_calls.get(endpoint, 0.0):.2f}"
+                )
+        if base['p95_ms']:
+            limit = max(base['p95_ms'] * (1 + max_regression), base['p95_ms'] + latency_floor_ms)
+            if summary['p95_ms'] > limit:
+                failures.append(f"{scenario}: p95 {summary['p95_ms']}ms > limit {limit:.1f}ms (baseline {base['p95_ms']}ms)")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Offline workbot benchmark against local Slack/OpenAI/Jira stubs')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--rate', type=float, default=20.0, help='requests per second for HTTP scenarios')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per HTTP scenario')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--poll-iterations', type=int, default=20)
+    parser.add_argument('--poll-rate', type=float, default=0.0, help='process_messages runs per second (0 = back to back)')
+    parser.add_argument('--messages-per-poll', type=int, default=5)
+    parser.add_argument('--thread-replies', type=int, default=5)
+    parser.add_argument('--channels', type=int, default=1, help='number of routed channels')
+    parser.add_argument('--channel-concurrency', type=int, default=2, help='workers per channel partition')
+    parser.add_argument('--slack-latency-ms', type=float, default=0.0)
+    parser.add_argument('--openai-latency-ms', type=float, default=0.0)
+    parser.add_argument('--openai-output-tokens', type=int, default=50)
+    parser.add_argument('--jira-latency-ms', type=float, default=0.0)
+    parser.add_argument('--output', help='write JSON results to this path')
+    parser.add_argument('--baseline', help='baseline JSON results to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.25, help='allowed relative p95 regression (0.25 = 25%%)')
+    parser.add_argument('--latency-floor-ms', type=float, default=250.0,
+                        help='p95 must also exceed the baseline by this many ms to count as a regression')
+    parser.add_argument('--max-call-regression', type=float, default=0.1,
+                        help='allowed relative increase of upstream calls per request, per endpoint')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    started = time.time()
+    results = run(args)
+    results['wall_seconds'] = round(time.time() - started, 2)
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        failures = check_regressions(
+            results, baseline, args.max_regression, args.max_call_regression, args.latency_floor_ms
+        )
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
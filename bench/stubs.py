@@ -0,0 +1,241 @@
+"""
+벤치마크용 로컬 업스트림 스텁 서버 (Slack Web API / OpenAI chat completions / Jira REST)
+
+외부 네트워크 없이 핫패스를 측정하기 위해 표준 라이브러리 http.server만 사용합니다.
+각 스텁은 엔드포인트별 호출 횟수를 집계합니다.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+class StubServer:
+    def __init__(self, latency_ms: float = 0.0):
+        """
+        스텁 서버 공통 기반
+
+        Args:
+            latency_ms: 모든 응답 전에 추가할 지연 (밀리초)
+        """
+        self.latency_ms = latency_ms
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StubServer':
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stub._dispatch(self, 'GET')
+
+            def do_POST(self):
+                stub._dispatch(self, 'POST')
+
+            def do_PUT(self):
+                stub._dispatch(self, 'PUT')
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def call_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.calls)
+
+    def _record(self, endpoint: str):
+        with self._lock:
+            self.calls[endpoint] += 1
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler, method: str):
+        length = int(handler.headers.get('Content-Length') or 0)
+        raw = handler.rfile.read(length) if length else b''
+        parsed = urlparse(handler.path)
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        status, body = self.handle(method, parsed.path, parse_qs(parsed.query), raw, handler.headers)
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json; charset=utf-8')
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def handle(self, method: str, path: str, query: Dict, raw: bytes, headers) -> tuple:
+        raise NotImplementedError
+
+
+class SlackStub(StubServer):
+    def __init__(self, latency_ms: float = 0.0, messages_per_history: int = 5, thread_replies: int = 5):
+        """
+        Slack Web API 스텁
+
+        Args:
+            messages_per_history: conversations.history 호출마다 돌려줄 신규 메시지 수
+            thread_replies: conversations.replies가 돌려줄 스레드 메시지 수
+        """
+        super().__init__(latency_ms)
+        self.messages_per_history = messages_per_history
+        self.thread_replies = thread_replies
+        self._ts_counter = 0
+
+    def _next_ts(self) -> str:
+        with self._lock:
+            self._ts_counter += 1
+            return f"{time.time():.0f}.{self._ts_counter:06d}"
+
+    @staticmethod
+    def _params(raw: bytes, query: Dict, headers) -> Dict:
+        if 'application/json' in (headers.get('Content-Type') or ''):
+            return json.loads(raw or b'{}')
+        params = {k: v[0] for k, v in parse_qs(raw.decode('utf-8')).items()}
+        params.update({k: v[0] for k, v in query.items()})
+        return params
+
+    def handle(self, method, path, query, raw, headers):
+        api_method = path.rstrip('/').rsplit('/', 1)[-1]
+        self._record(api_method)
+        params = self._params(raw, query, headers)
+        channel = params.get('channel', 'CBENCH')
+        if api_method == 'auth.test':
+            return 200, {'ok': True, 'user_id': 'UBOT', 'bot_id': 'BBOT', 'team_id': 'TBENCH'}
+        if api_method == 'conversations.history':
+            messages = [
+                {'type': 'message', 'user': f'U{i % 3}', 'text': f'결제 후 재매칭권이 차감되지 않는 버그 #{i}', 'ts': self._next_ts()}
+                for i in range(self.messages_per_history)
+            ]
+            return 200, {'ok': True, 'messages': messages, 'has_more': False}
+        if api_method == 'conversations.replies':
+            thread_ts = params.get('ts', self._next_ts())
+            messages = [
+                {'type': 'message', 'user': f'U{i % 3}', 'text': f'스레드 메시지 {i}: 로그 확인 부탁드립니다', 'ts': f'{float(thread_ts) + i:.6f}'}
+                for i in range(self.thread_replies)
+            ]
+            return 200, {'ok': True, 'messages': messages, 'has_more': False}
+        if api_method == 'users.info':
+            user = params.get('user', 'U0')
+            return 200, {'ok': True, 'user': {'id': user, 'name': user.lower(), 'real_name': f'벤치 사용자 {user}'}}
+        if api_method in ('chat.postMessage', 'chat.update'):
+            return 200, {'ok': True, 'channel': channel, 'ts': params.get('ts') or self._next_ts()}
+        if api_method == 'chat.delete':
+            return 200, {'ok': True, 'channel': channel, 'ts': params.get('ts')}
+        if api_method == 'chat.postEphemeral':
+            return 200, {'ok': True, 'message_ts': self._next_ts()}
+        return 200, {'ok': False, 'error': 'unknown_method'}
+
+
+class OpenAIStub(StubServer):
+    def __init__(self, latency_ms: float = 0.0, output_tokens: int = 50, need_ticket: bool = True):
+        """
+        OpenAI 호환 chat completions 스텁
+
+        Args:
+            output_tokens: 응답의 reasoning 필드에 채울 대략적인 토큰 수
+            need_ticket: 분석 결과에서 티켓 생성이 필요하다고 응답할지 여부
+        """
+        super().__init__(latency_ms)
+        self.output_tokens = output_tokens
+        self.need_ticket = need_ticket
+
+    def handle(self, method, path, query, raw, headers):
+        if not path.endswith('/chat/completions'):
+            self._record(path)
+            return 404, {'error': {'message': 'not found'}}
+        self._record('chat.completions')
+        request = json.loads(raw or b'{}')
+        analysis = {
+            'need_ticket': self.need_ticket,
+            'confidence': 0.9,
+            'reasoning': ' '.join(['분석'] * self.output_tokens),
+            'ticket_info': {
+                'summary': '결제 후 재매칭권 차감 오류 수정',
+                'description': '결제 완료 후 재매칭권이 차감되지 않는 현상',
+                'issue_type': '버그',
+                'priority': 'High',
+                'assignee': '최은기'
+            }
+        }
+        content = json.dumps(analysis, ensure_ascii=False)
+        prompt_chars = sum(len(m.get('content', '')) for m in request.get('messages', []))
+        return 200, {
+            'id': 'chatcmpl-bench',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'bench'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_chars // 4,
+                'completion_tokens': self.output_tokens,
+                'total_tokens': prompt_chars // 4 + self.output_tokens
+            }
+        }
+
+
+class JiraStub(StubServer):
+    def __init__(self, latency_ms: float = 0.0, recent_tickets: int = 30):
+        """
+        Jira REST API(v2) 스텁
+
+        Args:
+            recent_tickets: 검색 결과로 돌려줄 티켓 수
+        """
+        super().__init__(latency_ms)
+        self.recent_tickets = recent_tickets
+        self._issue_counter = 0
+
+    def _issue(self, key: str, summary: str = '벤치 티켓') -> Dict:
+        return {
+            'id': key.split('-')[-1],
+            'key': key,
+            'self': f'{self.url}/rest/api/2/issue/{key}',
+            'fields': {'summary': summary, 'description': ''}
+        }
+
+    def handle(self, method, path, query, raw, headers):
+        if path.endswith('/serverInfo'):
+            self._record('serverInfo')
+            return 200, {'baseUrl': self.url, 'version': '9.4.0', 'versionNumbers': [9, 4, 0], 'deploymentType': 'Server'}
+        if path.endswith('/field'):
+            self._record('field')
+            return 200, []
+        if path.endswith('/search'):
+            self._record('search')
+            issues = [self._issue(f'SOM-{i}', f'기존 티켓 {i}') for i in range(1, self.recent_tickets + 1)]
+            return 200, {'startAt': 0, 'maxResults': len(issues), 'total': len(issues), 'issues': issues}
+        if path.endswith('/issue') and method == 'POST':
+            self._record('issue.create')
+            with self._lock:
+                self._issue_counter += 1
+                key = f'SOM-{1000 + self._issue_counter}'
+            return 201, {'id': key.split('-')[-1], 'key': key, 'self': f'{self.url}/rest/api/2/issue/{key}'}
+        if '/issue/' in path and method == 'GET':
+            self._record('issue.get')
+            return 200, self._issue(path.rsplit('/', 1)[-1])
+        self._record(path)
+        return 404, {'errorMessages': ['not found']}
@@ -14,10 +14,14 @@ class Config:
     SLACK_BOT_TOKEN = os.getenv('SLACK_BOT_TOKEN')
     SLACK_SIGNING_SECRET = os.getenv('SLACK_SIGNING_SECRET')
     SLACK_CHANNEL_ID = os.getenv('SLACK_CHANNEL_ID')
+    SLACK_API_URL = os.getenv('SLACK_API_URL', 'https://slack.com/api/')
+    # X-Slack-Retry-Num 재시도 이벤트를 본문 파싱 전에 즉시 ack하고 버릴지 여부
+    SLACK_DROP_RETRIES = os.getenv('SLACK_DROP_RETRIES', 'true').lower() == 'true'
     
     # OpenAI 설정  
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+    OPENAI_BASE_URL: Optional[str] = os.getenv('OPENAI_BASE_URL')
     
     # Jira 설정
     JIRA_SERVER = os.getenv('JIRA_SERVER')
@@ -32,7 +36,11 @@ class Config:
     REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
     
     # DynamoDB 설정 (Redis 대안)
+    # 처리 완료 상태는 compact 포맷 테이블(바이너리 키)에 저장하고,
+    # 기존 테이블은 구 포맷 아이템이 TTL로 만료될 때까지 읽기 전용으로만 조회
+    DYNAMODB_STATE_TABLE_NAME = os.getenv('DYNAMODB_STATE_TABLE_NAME', 'workbot-processed-state')
     DYNAMODB_TABLE_NAME = os.getenv('DYNAMODB_TABLE_NAME', 'workbot-processed-messages')
+    DYNAMODB_LEGACY_READS = os.getenv('DYNAMODB_LEGACY_READS', 'true').lower() == 'true'
     
     # 로그 레벨
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -40,14 +48,44 @@ class Config:
     # 메시지 처리 설정
     MESSAGE_LOOKBACK_MINUTES = int(os.getenv('MESSAGE_LOOKBACK_MINUTES', '5'))
     
+    # 채널 라우팅 설정 (채널 -> Jira 프로젝트/프롬프트/모델, routing.py 참고)
+    CHANNEL_ROUTES: Optional[str] = os.getenv('CHANNEL_ROUTES')
+    CHANNEL_ROUTES_PATH: Optional[str] = os.getenv('CHANNEL_ROUTES_PATH')
+    CHANNEL_CONCURRENCY = int(os.getenv('CHANNEL_CONCURRENCY', '2'))
+    CHANNEL_MAX_PENDING = int(os.getenv('CHANNEL_MAX_PENDING', '100'))
+    
+    # 스케줄러 설정 (폴링 주기는 채널 활동량에 따라 MIN~MAX 사이에서 조절)
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'true').lower() == 'true'
+    SCHEDULER_MIN_INTERVAL_SECONDS = int(os.getenv('SCHEDULER_MIN_INTERVAL_SECONDS', '60'))
+    SCHEDULER_MAX_INTERVAL_SECONDS = int(os.getenv('SCHEDULER_MAX_INTERVAL_SECONDS', '240'))
+    SCHEDULER_LEASE_TABLE_NAME = os.getenv('SCHEDULER_LEASE_TABLE_NAME', 'workbot-scheduler-lease')
+    SCHEDULER_LEASE_SECONDS = int(os.getenv('SCHEDULER_LEASE_SECONDS', '90'))
+    
+    # 업스트림 호출 보호 설정 (서킷 브레이커 / 재시도 / 타임아웃)
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+    BREAKER_RESET_SECONDS = float(os.getenv('BREAKER_RESET_SECONDS', '30'))
+    RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '2'))
+    RETRY_BUDGET_RATIO = float(os.getenv('RETRY_BUDGET_RATIO', '0.1'))
+    RETRY_MAX_BACKOFF_SECONDS = float(os.getenv('RETRY_MAX_BACKOFF_SECONDS', '2'))
+    SLACK_TIMEOUT_SECONDS = int(os.getenv('SLACK_TIMEOUT_SECONDS', '10'))
+    OPENAI_TIMEOUT_SECONDS = float(os.getenv('OPENAI_TIMEOUT_SECONDS', '30'))
+    JIRA_TIMEOUT_SECONDS = float(os.getenv('JIRA_TIMEOUT_SECONDS', '10'))
+    
+    # 요청 데드라인 설정 (Slack은 3초 안에 ack를 받아야 하므로 작업은 ack 이후 별도 데드라인으로 처리)
+    SLACK_EVENT_DEADLINE_SECONDS = float(os.getenv('SLACK_EVENT_DEADLINE_SECONDS', '60'))
+    SLACK_INTERACTION_DEADLINE_SECONDS = float(os.getenv('SLACK_INTERACTION_DEADLINE_SECONDS', '20'))
+    
     @classmethod
     def validate(cls):
         """필수 환경 변수 검증"""
         required = [
-            cls.SLACK_BOT_TOKEN, cls.SLACK_SIGNING_SECRET, cls.SLACK_CHANNEL_ID,
-            cls.JIRA_SERVER, cls.JIRA_USER, cls.JIRA_API_TOKEN, cls.JIRA_PROJECT_KEY,
+            cls.SLACK_BOT_TOKEN, cls.SLACK_SIGNING_SECRET,
+            cls.JIRA_SERVER, cls.JIRA_USER, cls.JIRA_API_TOKEN,
             cls.OPENAI_API_KEY
         ]
+        # 라우팅 테이블을 쓰지 않으면 단일 채널/프로젝트 설정이 필요
+        if not (cls.CHANNEL_ROUTES or cls.CHANNEL_ROUTES_PATH):
+            required += [cls.SLACK_CHANNEL_ID, cls.JIRA_PROJECT_KEY]
         if not all(required):
             raise ValueError('필수 환경변수 누락')
         
@@ -3,17 +3,31 @@ Jira API 클라이언트 모듈
 """
 import logging
 from typing import Dict, Optional
-from jira import JIRA
+from jira import JIRA, JIRAError
 from .config import config
+from .resilience import get_breaker, is_network_error
 
 logger = logging.getLogger(__name__)
 
+def _is_upstream_failure(e: Exception) -> bool:
+    """네트워크 오류/레이트 리밋/5xx만 Jira 장애로 간주합니다. (권한/필드 오류, 코드 오류 등은 제외)"""
+    if isinstance(e, JIRAError):
+        return e.status_code is None or e.status_code == 429 or e.status_code >= 500
+    return is_network_error(e)
+
 class JiraClient:
     def __init__(self):
         """Jira 클라이언트 초기화"""
         try:
             options = {'server': config.JIRA_SERVER}
-            self.jira = JIRA(options, basic_auth=(config.JIRA_USER, config.JIRA_API_TOKEN))
+            # 재시도는 resilience 계층에서 예산 내로만 수행
+            self.jira = JIRA(
+                options,
+                basic_auth=(config.JIRA_USER, config.JIRA_API_TOKEN),
+                timeout=config.JIRA_TIMEOUT_SECONDS,
+                max_retries=0
+            )
+            self.breaker = get_breaker('jira', is_failure=_is_upstream_failure)
             logger.info("Jira client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Jira client: {e}")
@@ -44,7 +58,7 @@ class JiraClient:
             priority = "Medium"
         fields['priority'] = {'name': priority}
         try:
-            issue = self.jira.create_issue(fields=fields)
+            issue = self.breaker.call(self.jira.create_issue, fields=fields, idempotent=False)
             return issue.key
         except Exception as e:
             logger.error(f"Failed to create Jira issue: {e}")
@@ -63,10 +77,10 @@ class JiraClient:
             logger.error(f"Failed to get assignee account ID: {e}")
             return None
 
-    def get_recent_tickets(self, max_results: int = 30) -> list:
+    def get_recent_tickets(self, max_results: int = 30, project_key: str = None) -> list:
         """최근 생성된 티켓의 summary/description 리스트 반환"""
         try:
-            issues = self.jira.search_issues(f'project={config.JIRA_PROJECT_KEY} ORDER BY created DESC', maxResults=max_results, fields='summary,description')
+            issues = self.breaker.call(self.jira.search_issues, f'project={project_key or config.JIRA_PROJECT_KEY} ORDER BY created DESC', maxResults=max_results, fields='summary,description')
             ticket_list = []
             for issue in issues:
                 ticket_list.append({
@@ -1,9 +1,12 @@
 """
 메인 Lambda 핸들러
 """
+import contextvars
 import json
 import logging
-from typing import Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
 from .config import config
 from .slack_client import SlackClient
 from .jira_client import JiraClient
@@ -11,7 +14,12 @@ from .openai_client import OpenAIClient
 from .message_processor import MessageProcessor, extract_ticket_candidates
 from fastapi import FastAPI, Request, status, APIRouter
 from fastapi.responses import JSONResponse, PlainTextResponse
-# from . import scheduler
+from starlette.background import BackgroundTask
+from .scheduler import PollingScheduler
+from .metrics import metrics
+from .resilience import deadline, remaining, breaker_states
+from .slack_signature import SlackSignatureMiddleware
+from .routing import ChannelRoute, ChannelWorkers, load_routing_table
 
 # 로깅 설정
 logging.basicConfig(
@@ -26,19 +34,67 @@ jira_client = JiraClient()
 openai_client = OpenAIClient()
 message_processor = MessageProcessor()
 
+# 채널 라우팅 및 채널별 워커 파티션 (한 채널의 부하가 다른 채널의 처리를 막지 않도록 격리)
+routing_table = load_routing_table()
+channel_workers = ChannelWorkers()
+poll_executor = ThreadPoolExecutor(max_workers=max(1, len(routing_table.routes())), thread_name_prefix="poll")
+
 app = FastAPI()
+app.add_middleware(SlackSignatureMiddleware)
 
-processed_event_ids = set()
+# 최근 event_id만 유지 (http_timeout 재시도는 미들웨어에서 차단되고, http_error 등 실패 재시도와 그 외 중복은 여기서 거름)
+MAX_TRACKED_EVENT_IDS = 10000
+processed_event_ids: "OrderedDict[str, None]" = OrderedDict()
 
 slack_router = APIRouter(prefix="/slack", tags=["slack"])
 
-# @app.on_event("startup")
-# def on_startup():
-#     scheduler.start_scheduler()
+metrics.describe('workbot_slack_requests_rejected_total', 'Slack events/interactions not accepted because the channel queue was full')
+
+INTERACTION_REJECTED_TEXT = "요청이 많아 지금은 처리하지 못했습니다. 잠시 후 버튼을 다시 눌러주세요."
+
+polling_scheduler: Optional[PollingScheduler] = None
+
+@app.on_event("startup")
+def on_startup():
+    global polling_scheduler
+    if not config.SCHEDULER_ENABLED:
+        logger.info("Scheduler disabled by SCHEDULER_ENABLED")
+        return
+    # 테이블이 없는 상태로 뜨면 폴링이 조용히 멈추므로 기동 단계에서 실패시킴
+    message_processor.check_tables()
+    polling_scheduler = PollingScheduler(process_messages)
+    polling_scheduler.start()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    if polling_scheduler:
+        polling_scheduler.shutdown()
+    channel_workers.shutdown()
+    poll_executor.shutdown(wait=False)
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    breakers = breaker_states()
+    degraded = any(b['state'] != 'closed' for b in breakers.values())
+    result = {"breakers": breakers}
+    if polling_scheduler:
+        scheduler_status = polling_scheduler.status()
+        # 다른 레플리카에 리스를 뺏긴 것은 정상, 백엔드 오류로 리더가 되지 못하는 것은 성능 저하
+        degraded = degraded or scheduler_status["lease_error"] is not None
+        result["scheduler"] = scheduler_status
+    return {"status": "degraded" if degraded else "ok", **result}
+
+@app.get("/metrics")
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def handle_interaction_payload(payload_dict: Dict[str, Any]):
+    """ack 이후 인터랙션을 처리합니다."""
+    result = slack_client.handle_interaction(payload_dict)
+    if result.get("ok"):
+        logger.info(f"슬랙 인터랙션 처리 완료: {result}")
+    else:
+        logger.error(f"슬랙 인터랙션 처리 실패: {result}")
 
 @slack_router.post("/interactions")
 async def slack_interactions(request: Request):
@@ -47,13 +103,47 @@ async def slack_interactions(request: Request):
     if payload:
         payload_dict = json.loads(payload)
         logger.info(f"슬랙 인터랙션 payload: {payload_dict}")
-        result = slack_client.handle_interaction(payload_dict)
-        if result.get("ok"):
-            return PlainTextResponse("티켓이 생성되었습니다.", status_code=200)
-        else:
-            return PlainTextResponse("티켓 생성에 실패했습니다.", status_code=200)
+        # Slack은 3초 안에 ack를 받아야 하므로 Jira/Slack 호출은 응답 이후 채널 워커에서 처리
+        channel_id = payload_dict.get('channel', {}).get('id')
+        route = routing_table.resolve(channel_id)
+        with deadline(config.SLACK_INTERACTION_DEADLINE_SECONDS):
+            submitted = route is not None and channel_workers.submit(route, handle_interaction_payload, payload_dict) is not None
+        if not submitted:
+            # Slack은 인터랙션을 재전송하지 않으므로 버튼을 누른 사용자에게 다시 시도하도록 알림
+            logger.error(f"슬랙 인터랙션을 처리할 채널 워커가 없어 처리하지 못했습니다: channel={channel_id}")
+            metrics.inc('workbot_slack_requests_rejected_total', kind='interaction')
+            user_id = payload_dict.get('user', {}).get('id')
+            if channel_id and user_id:
+                # ack를 늦추지 않도록 안내 메시지는 응답을 보낸 뒤 전송
+                return PlainTextResponse("", status_code=200, background=BackgroundTask(
+                    send_interaction_rejected, channel_id, user_id
+                ))
+        return PlainTextResponse("", status_code=200)
     return PlainTextResponse("No payload", status_code=400)
 
+def send_interaction_rejected(channel_id: str, user_id: str):
+    """처리하지 못한 인터랙션을 누른 사용자에게 다시 시도하라는 안내를 보냅니다."""
+    with deadline(config.SLACK_INTERACTION_DEADLINE_SECONDS):
+        slack_client.send_ephemeral(channel_id, user_id, INTERACTION_REJECTED_TEXT)
+
+def handle_app_mention(route: ChannelRoute, message: Dict[str, Any]):
+    """ack 이후 멘션된 스레드를 이벤트가 발생한 채널 기준으로 분석하고 승인 요청을 보냅니다."""
+    thread_ts = message["thread_ts"]
+    thread_context = slack_client.get_thread_context(thread_ts, channel=route.channel_id)
+    logger.info(f"[app_mention] thread_context for ts={thread_ts}:\n{thread_context}")
+    analysis_result = openai_client.analyze_thread_context(
+        thread_context, route.thread_system_prompt, route.model
+    ) if thread_context else None
+    if analysis_result:
+        candidates = analysis_result if isinstance(analysis_result, list) else [analysis_result]
+        for candidate in candidates:
+            if isinstance(candidate, dict) and candidate.get('need_ticket', False) and candidate.get('confidence', 0) > 0.5:
+                ticket_info = candidate['ticket_info']
+                approval_ts = slack_client.send_approval_message(
+                    ticket_info, message, project_key=route.jira_project_key
+                )
+                logger.info(f"[app_mention] Approval request sent: {approval_ts}")
+
 @slack_router.post("/event")
 async def slack_event(request: Request):
     body = await request.json()
@@ -62,39 +152,37 @@ async def slack_event(request: Request):
         logger.info(f"[app_mention] Duplicate event_id: {event_id}, skipping.")
         return JSONResponse(content={"ok": True})
     if event_id:
-        processed_event_ids.add(event_id)
+        processed_event_ids[event_id] = None
+        if len(processed_event_ids) > MAX_TRACKED_EVENT_IDS:
+            processed_event_ids.popitem(last=False)
     if body.get("type") == "url_verification":
         return JSONResponse(content={"challenge": body.get("challenge")})
     if body.get("type") == "event_callback":
         event = body.get("event", {})
         if event.get("type") == "app_mention":
-            user = event.get("user")
-            text = event.get("text", "")
             ts = event.get("ts")
-            thread_ts = event.get("thread_ts") or ts
-            channel = event.get("channel")
             message = {
-                "user": user,
-                "text": text,
+                "user": event.get("user"),
+                "text": event.get("text", ""),
                 "ts": ts,
-                "thread_ts": thread_ts,
-                "channel": channel
+                "thread_ts": event.get("thread_ts") or ts,
+                "channel": event.get("channel")
             }
-            thread_context = slack_client.get_thread_context(thread_ts)
-            logger.info(f"[app_mention] thread_context for ts={thread_ts}:\n{thread_context}")
-            analysis_result = openai_client.analyze_thread_context(thread_context) if thread_context else None
-            if analysis_result:
-                if isinstance(analysis_result, list):
-                    for candidate in analysis_result:
-                        if candidate.get('need_ticket', False) and candidate.get('confidence', 0) > 0.5:
-                            ticket_info = candidate['ticket_info']
-                            approval_ts = slack_client.send_approval_message(ticket_info, message)
-                            logger.info(f"[app_mention] Approval request sent: {approval_ts}")
-                elif isinstance(analysis_result, dict):
-                    if analysis_result.get('need_ticket', False) and analysis_result.get('confidence', 0) > 0.5:
-                        ticket_info = analysis_result['ticket_info']
-                        approval_ts = slack_client.send_approval_message(ticket_info, message)
-                        logger.info(f"[app_mention] Approval request sent: {approval_ts}")
+            route = routing_table.resolve(message["channel"])
+            if route is None:
+                logger.warning(f"[app_mention] No route for channel {message['channel']}, skipping.")
+                return JSONResponse(content={"ok": True})
+            # 스레드 분석은 Slack 3초 ack 예산을 넘기므로 응답 이후 채널 워커에서 처리
+            # (데드라인은 이벤트 수신 시점부터 계산되어 워커로 전달됨)
+            with deadline(config.SLACK_EVENT_DEADLINE_SECONDS):
+                future = channel_workers.submit(route, handle_app_mention, route, message)
+            if future is None:
+                # 채널 큐가 가득 찬 경우 ack하지 않고 5xx로 응답해 Slack이 재전송하도록 함
+                # (http_error 재시도는 미들웨어를 통과하므로 event_id 기록도 되돌림)
+                if event_id:
+                    processed_event_ids.pop(event_id, None)
+                metrics.inc('workbot_slack_requests_rejected_total', kind='event')
+                return JSONResponse(content={"ok": False, "error": "busy"}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
             return JSONResponse(content={"ok": True})
     return JSONResponse(content={"ok": True})
 
@@ -104,53 +192,121 @@ def slack_event_health():
 
 app.include_router(slack_router)
 
+def process_message(route: ChannelRoute, message: Dict[str, Any]) -> Optional[bool]:
+    """
+    메시지 하나를 분석하고 필요하면 승인 요청을 보냅니다.
+
+    Returns:
+        승인 요청을 보냈는지 여부, 분석하지 못해 다음 폴링으로 미룬 경우 None
+    """
+    if remaining() == 0:
+        # 처리 표시하지 않았으므로 다음 폴링에서 다시 처리됨
+        return None
+    user_name = slack_client.get_user_info(message['user']) or message['user']
+    # thread_ts가 있으면 스레드 전체 문맥 분석, 아니면 기존 단일 메시지 분석
+    if message.get('thread_ts'):
+        thread_context = slack_client.get_thread_context(message['thread_ts'], channel=route.channel_id)
+        logger.info(f"Thread context for ts={message['thread_ts']}:\n{thread_context}")
+        analysis_result = openai_client.analyze_thread_context(
+            thread_context, route.thread_system_prompt, route.model
+        ) if thread_context else None
+    else:
+        logger.info(f"Analyzing message from {user_name}: {message['text'][:50]}...")
+        analysis_result = openai_client.analyze_message(
+            message['text'], user_name, route.system_prompt, route.model
+        )
+    if not analysis_result:
+        logger.warning("Failed to analyze message")
+        return None
+    requested = False
+    if analysis_result.get('need_ticket', False) and analysis_result.get('confidence', 0) > 0.5:
+        logger.info(f"Requesting ticket creation for message: {analysis_result['reasoning']}")
+        ticket_info = analysis_result['ticket_info']
+        approval_ts = slack_client.send_approval_message(
+            ticket_info, message, project_key=route.jira_project_key
+        )
+        if approval_ts:
+            requested = True
+            logger.info(f"Approval request sent: {approval_ts}")
+    message_processor.mark_message_processed(message['_hash'], {
+        'user': user_name,
+        'text': message['text'],
+        'analysis': analysis_result
+    })
+    return requested
+
+def process_channel(route: ChannelRoute) -> Dict[str, int]:
+    """채널 하나의 새 메시지를 해당 채널 전용 워커에서 처리합니다."""
+    logger.info(f"Fetching messages from {route.channel_id} for last {config.MESSAGE_LOOKBACK_MINUTES} minutes")
+    messages = slack_client.get_recent_messages(config.MESSAGE_LOOKBACK_MINUTES, channel=route.channel_id)
+    if not messages:
+        logger.info(f"No messages found in {route.channel_id}")
+        return {"new_messages": 0, "processed": 0, "tickets_requested": 0}
+    new_messages = message_processor.filter_new_messages(messages)
+    if not new_messages:
+        logger.info(f"No new messages to process in {route.channel_id}")
+        return {"new_messages": 0, "processed": 0, "tickets_requested": 0}
+    futures = []
+    for message in new_messages:
+        future = channel_workers.submit(route, process_message, route, message)
+        if future is None:
+            # 채널 큐가 가득 찬 경우 나머지는 다음 폴링에서 처리
+            break
+        futures.append(future)
+    processed = 0
+    tickets_requested = 0
+    for future in futures:
+        try:
+            requested = future.result()
+        except Exception as e:
+            logger.error(f"Failed to process message: {e}")
+            continue
+        if requested is None:
+            continue
+        processed += 1
+        tickets_requested += int(requested)
+    logger.info(f"[{route.channel_id}] Processed {processed}/{len(new_messages)} new messages, requested {tickets_requested} tickets")
+    return {"new_messages": len(new_messages), "processed": processed, "tickets_requested": tickets_requested}
+
 def process_messages():
-    """메시지를 처리하는 메인 로직"""
+    """모든 라우팅 채널의 메시지를 채널별로 병렬 처리하는 메인 로직"""
+    routes = routing_table.routes()
+    # 현재 컨텍스트(폴링 데드라인)를 채널 작업에 그대로 전달
+    futures = {
+        route.channel_id: poll_executor.submit(contextvars.copy_context().run, process_channel, route)
+        for route in routes
+    }
+    channels = {}
+    for channel_id, future in futures.items():
+        try:
+            channels[channel_id] = future.result()
+        except Exception as e:
+            logger.error(f"Failed to process messages in {channel_id}: {e}")
+            channels[channel_id] = {"new_messages": 0, "processed": 0, "tickets_requested": 0, "error": str(e)}
+    new_messages = sum(c["new_messages"] for c in channels.values())
+    processed = sum(c["processed"] for c in channels.values())
+    tickets_requested = sum(c["tickets_requested"] for c in channels.values())
+    logger.info(f"Processed {processed} messages in {len(channels)} channels, requested {tickets_requested} tickets")
+    return {
+        "new_messages": new_messages,
+        "processed": processed,
+        "tickets_requested": tickets_requested,
+        "channels": channels
+    }
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """스케줄 이벤트용 단발성 핸들러 (리스를 획득한 경우에만 처리)"""
+    scheduler = PollingScheduler(process_messages)
+    # Lambda 남은 실행 시간에서 여유분을 뺀 만큼을 데드라인으로 사용
+    budget = context.get_remaining_time_in_millis() / 1000 - 5 if context else None
     try:
-        logger.info(f"Fetching messages from last {config.MESSAGE_LOOKBACK_MINUTES} minutes")
-        messages = slack_client.get_recent_messages(config.MESSAGE_LOOKBACK_MINUTES)
-        if not messages:
-            logger.info("No messages found")
-            return {"processed": 0, "tickets_requested": 0}
-        new_messages = message_processor.filter_new_messages(messages)
-        if not new_messages:
-            logger.info("No new messages to process")
-            return {"processed": 0, "tickets_requested": 0}
-        tickets_requested = 0
-        for message in new_messages:
-            try:
-                user_name = slack_client.get_user_info(message['user']) or message['user']
-                # thread_ts가 있으면 스레드 전체 문맥 분석, 아니면 기존 단일 메시지 분석
-                if message.get('thread_ts'):
-                    thread_context = slack_client.get_thread_context(message['thread_ts'])
-                    logger.info(f"Thread context for ts={message['thread_ts']}:\n{thread_context}")
-                    analysis_result = openai_client.analyze_thread_context(thread_context) if thread_context else None
-                else:
-                    logger.info(f"Analyzing message from {user_name}: {message['text'][:50]}...")
-                    analysis_result = openai_client.analyze_message(message['text'], user_name)
-                if not analysis_result:
-                    logger.warning("Failed to analyze message")
-                    continue
-                if analysis_result.get('need_ticket', False) and analysis_result.get('confidence', 0) > 0.5:
-                    logger.info(f"Requesting ticket creation for message: {analysis_result['reasoning']}")
-                    ticket_info = analysis_result['ticket_info']
-                    approval_ts = slack_client.send_approval_message(ticket_info, message)
-                    if approval_ts:
-                        tickets_requested += 1
-                        logger.info(f"Approval request sent: {approval_ts}")
-                message_processor.mark_message_processed(message['_hash'], {
-                    'user': user_name,
-                    'text': message['text'],
-                    'analysis': analysis_result
-                })
-            except Exception as e:
-                logger.error(f"Failed to process message: {e}")
-                continue
-        logger.info(f"Processed {len(new_messages)} messages, requested {tickets_requested} tickets")
-        return {"processed": len(new_messages), "tickets_requested": tickets_requested}
-    except Exception as e:
-        logger.error(f"Failed to process messages: {e}")
-        raise
+        with deadline(budget):
+            result = scheduler.run_once()
+    finally:
+        scheduler.shutdown()
+    if result is None:
+        return {"skipped": True}
+    return result
 
 # 로컬 테스트용
 if __name__ == "__main__":
@@ -159,7 +315,3 @@ if __name__ == "__main__":
     
     result = lambda_handler({}, None)
     print(json.dumps(result, indent=2, ensure_ascii=False))
-
-# 기존 Lambda 핸들러 및 단발성 실행부는 주석 처리
-# def lambda_handler(...):
-#     ...
@@ -1,19 +1,28 @@
 """
 메시지 처리 및 중복 방지 모듈
 """
-import json
 import logging
-import hashlib
+import random
+import threading
+import time
 import boto3
-from typing import List, Dict, Set, Optional
-from datetime import datetime
+from botocore.exceptions import ClientError
+from typing import List, Dict, Set, Optional, Tuple
 from .config import config
+from .state_format import (
+    KEY_ATTR, LEGACY_KEY_ATTR, message_digest, encode_record, decode_record
+)
 import os
 from .openai_client import classify_messages
 from .jira_client import JiraClient
+from .resilience import remaining
 
 logger = logging.getLogger(__name__)
 
+# BatchGetItem UnprocessedKeys 재요청 정책 (스로틀링 시 DynamoDB를 연속으로 두드리지 않도록 제한)
+BATCH_GET_MAX_ATTEMPTS = 5
+BATCH_GET_BASE_BACKOFF_SECONDS = 0.05
+
 PROMPT_PATH = os.path.join(os.path.dirname(__file__), '../prompts/system_prompt.txt')
 
 def load_system_prompt():
@@ -22,9 +31,9 @@ def load_system_prompt():
 
 jira_client = JiraClient()
 
-def extract_ticket_candidates(messages):
+def extract_ticket_candidates(messages, project_key=None):
     system_prompt = load_system_prompt()
-    recent_tickets = jira_client.get_recent_tickets(max_results=30)
+    recent_tickets = jira_client.get_recent_tickets(max_results=30, project_key=project_key)
     logger.info(f"messages: {messages}")
     return classify_messages(messages, system_prompt, recent_tickets)
 
@@ -33,38 +42,99 @@ class MessageProcessor:
         """메시지 처리기 초기화"""
         self.processed_messages: Set[str] = set()
         
-        # DynamoDB 클라이언트 초기화 (중복 처리 방지용)
+        # DynamoDB 리소스는 스레드 안전하지 않으므로 폴링/채널 워커 스레드마다 따로 생성
+        self._local = threading.local()
+        self._legacy_reads = config.DYNAMODB_LEGACY_READS
+        self._enabled = True
+        self._enabled = self._resources() is not None
+    
+    def _resources(self) -> Optional[Dict]:
+        """현재 스레드 전용 DynamoDB 리소스와 테이블을 반환합니다. (초기화 실패 시 None)"""
+        resources = getattr(self._local, 'resources', None)
+        if resources is not None or not self._enabled:
+            return resources
         try:
-            self.dynamodb = boto3.resource('dynamodb', region_name=config.AWS_REGION)
-            self.table = self.dynamodb.Table(config.DYNAMODB_TABLE_NAME)
+            dynamodb = boto3.session.Session().resource('dynamodb', region_name=config.AWS_REGION)
+            resources = {
+                'dynamodb': dynamodb,
+                'table': dynamodb.Table(config.DYNAMODB_STATE_TABLE_NAME),
+                # 구 포맷 테이블은 마이그레이션 기간(구 아이템 TTL 만료 전)에만 읽기 전용으로 조회
+                'legacy_table': dynamodb.Table(config.DYNAMODB_TABLE_NAME) if self._legacy_reads else None
+            }
         except Exception as e:
             logger.warning(f"Failed to initialize DynamoDB: {e}")
-            self.dynamodb = None
-            self.table = None
+            return None
+        self._local.resources = resources
+        return resources
+    
+    @property
+    def dynamodb(self):
+        resources = self._resources()
+        return resources['dynamodb'] if resources else None
+    
+    @property
+    def table(self):
+        resources = self._resources()
+        return resources['table'] if resources else None
+    
+    @property
+    def legacy_table(self):
+        resources = self._resources()
+        return resources['legacy_table'] if resources else None
+    
+    def check_tables(self):
+        """
+        상태 테이블에 접근할 수 있는지 확인합니다. (폴링 기동 전 호출)
+        구 포맷 테이블이 없으면 마이그레이션 읽기만 끄고 계속 진행합니다.
+
+        Raises:
+            RuntimeError: 상태 테이블에 접근할 수 없는 경우
+        """
+        probe = bytes(16)
+        try:
+            self.table.get_item(Key={KEY_ATTR: probe})
+        except Exception as e:
+            raise RuntimeError(f"Processed-state table {config.DYNAMODB_STATE_TABLE_NAME} is not available: {e}") from e
+        if self.legacy_table is not None:
+            try:
+                self.legacy_table.get_item(Key={LEGACY_KEY_ATTR: probe.hex()})
+            except Exception as e:
+                self._disable_legacy_reads(e)
+    
+    def _disable_legacy_reads(self, error: Exception):
+        """구 포맷 테이블 조회를 끕니다. (스레드별 리소스는 다음 접근 시 다시 생성됨)"""
+        logger.warning(f"Legacy table {config.DYNAMODB_TABLE_NAME} is not available, disabling legacy reads: {error}")
+        self._legacy_reads = False
+        self._local = threading.local()
     
     def get_message_hash(self, message: Dict) -> str:
         """메시지의 고유 해시를 생성합니다."""
-        content = f"{message['user']}_{message['text']}_{message['ts']}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return message_digest(message).hex()
+    
+    def get_record(self, message_hash: str) -> Optional[Dict]:
+        """처리 기록을 신규/구 포맷 구분 없이 읽어옵니다. (state_format.decode_record 형태)"""
+        try:
+            if self.table:
+                response = self.table.get_item(Key={KEY_ATTR: bytes.fromhex(message_hash)})
+                if 'Item' in response:
+                    return decode_record(response['Item'])
+            if self.legacy_table:
+                response = self.legacy_table.get_item(Key={LEGACY_KEY_ATTR: message_hash})
+                if 'Item' in response:
+                    return decode_record(response['Item'])
+        except Exception as e:
+            logger.error(f"Failed to read message record from DynamoDB: {e}")
+        return None
     
     def is_message_processed(self, message_hash: str) -> bool:
         """메시지가 이미 처리되었는지 확인합니다."""
         # 메모리에서 먼저 확인
         if message_hash in self.processed_messages:
             return True
-        
-        # DynamoDB에서 확인
-        if self.table:
-            try:
-                response = self.table.get_item(Key={'message_hash': message_hash})
-                return 'Item' in response
-            except Exception as e:
-                logger.error(f"Failed to check message in DynamoDB: {e}")
-        
-        return False
+        return self.get_record(message_hash) is not None
     
     def mark_message_processed(self, message_hash: str, message_data: Dict):
-        """메시지를 처리된 것으로 표시합니다."""
+        """메시지를 처리된 것으로 표시합니다. (원문은 저장하지 않고, 분석 결과는 긍정 판정인 경우만 압축 저장)"""
         # 메모리에 추가
         self.processed_messages.add(message_hash)
         
@@ -72,23 +142,106 @@ class MessageProcessor:
         if self.table:
             try:
                 self.table.put_item(
-                    Item={
-                        'message_hash': message_hash,
-                        'processed_at': datetime.now().isoformat(),
-                        'message_data': json.dumps(message_data, ensure_ascii=False),
-                        'ttl': int((datetime.now().timestamp() + 86400))  # 24시간 후 자동 삭제
-                    }
+                    Item=encode_record(bytes.fromhex(message_hash), message_data.get('analysis'))
                 )
             except Exception as e:
                 logger.error(f"Failed to save message to DynamoDB: {e}")
     
+    def _batch_existing(self, table, keys: List[Dict], key_attr: str) -> Tuple[Set[str], Set[str]]:
+        """
+        BatchGetItem으로 존재하는 키를 조회합니다. (요청당 최대 100개)
+
+        UnprocessedKeys는 지터가 포함된 지수 백오프로 최대 BATCH_GET_MAX_ATTEMPTS회까지 다시 요청하며,
+        그래도 남은 키나 데드라인 때문에 요청하지 못한 키는 미확인으로 반환합니다.
+
+        Returns:
+            (존재하는 hex 해시 집합, 존재 여부를 확인하지 못한 hex 해시 집합)
+        """
+        found: Set[str] = set()
+        unresolved: Set[str] = set()
+        for i in range(0, len(keys), 100):
+            chunk = keys[i:i + 100]
+            if remaining() == 0:
+                unresolved.update(self._key_hex(key[key_attr]) for key in chunk)
+                continue
+            request = {table.name: {'Keys': chunk, 'ProjectionExpression': key_attr}}
+            attempt = 0
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                for item in response.get('Responses', {}).get(table.name, []):
+                    found.add(self._key_hex(item[key_attr]))
+                request = response.get('UnprocessedKeys') or None
+                if not request:
+                    break
+                attempt += 1
+                backoff = random.uniform(0, BATCH_GET_BASE_BACKOFF_SECONDS * (2 ** attempt))
+                left = remaining()
+                if attempt >= BATCH_GET_MAX_ATTEMPTS or (left is not None and backoff >= left):
+                    pending = request[table.name]['Keys']
+                    logger.warning(f"{len(pending)} keys still unprocessed by BatchGetItem after {attempt} attempts")
+                    unresolved.update(self._key_hex(key[key_attr]) for key in pending)
+                    break
+                time.sleep(backoff)
+        return found, unresolved
+
+    @staticmethod
+    def _key_hex(value) -> str:
+        return value if isinstance(value, str) else bytes(getattr(value, 'value', value)).hex()
+    
+    def _find_processed(self, message_hashes: List[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        DynamoDB에서 이미 처리된 해시를 한 번에 조회합니다.
+        테이블별로 오류를 처리하며, 조회하지 못한 해시는 처리된 것도 새 것도 아닌 미확인으로 반환합니다.
+
+        Returns:
+            (처리된 해시 집합, 처리 여부를 확인하지 못한 해시 집합)
+        """
+        if not self.table or not message_hashes:
+            return set(), set()
+        try:
+            found, unresolved = self._batch_existing(
+                self.table, [{KEY_ATTR: bytes.fromhex(h)} for h in message_hashes], KEY_ATTR
+            )
+        except Exception as e:
+            logger.error(f"Failed to check messages in DynamoDB: {e}")
+            return set(), set(message_hashes)
+        missing = [h for h in message_hashes if h not in found and h not in unresolved]
+        legacy_table = self.legacy_table
+        if legacy_table and missing:
+            try:
+                legacy_found, legacy_unresolved = self._batch_existing(
+                    legacy_table, [{LEGACY_KEY_ATTR: h} for h in missing], LEGACY_KEY_ATTR
+                )
+                found |= legacy_found
+                unresolved |= legacy_unresolved
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') == 'ResourceNotFoundException':
+                    # 구 포맷 테이블이 없으면 구 기록도 없으므로 신규 테이블 결과만으로 판단
+                    self._disable_legacy_reads(e)
+                else:
+                    logger.error(f"Failed to check messages in legacy DynamoDB table: {e}")
+                    unresolved.update(missing)
+            except Exception as e:
+                logger.error(f"Failed to check messages in legacy DynamoDB table: {e}")
+                unresolved.update(missing)
+        return found, unresolved
+    
     def filter_new_messages(self, messages: List[Dict]) -> List[Dict]:
-        """새로운 메시지만 필터링합니다. (DynamoDB에 없는 _hash만 반환)"""
-        new_messages = []
+        """
+        새로운 메시지만 필터링합니다. (DynamoDB에 없는 _hash만 반환)
+
+        스로틀링 등으로 처리 여부를 확인하지 못한 메시지는 중복 승인 요청을 막기 위해 다음 폴링으로 미룹니다.
+        """
         for message in messages:
-            message_hash = self.get_message_hash(message)
-            message['_hash'] = message_hash
-            if not self.is_message_processed(message_hash):
-                new_messages.append(message)
+            message['_hash'] = self.get_message_hash(message)
+        unknown = list({m['_hash'] for m in messages if m['_hash'] not in self.processed_messages})
+        processed, unresolved = self._find_processed(unknown)
+        if unresolved:
+            logger.warning(f"Deferring {len(unresolved)} messages whose processed state could not be read")
+        new_messages = [
+            m for m in messages
+            if m['_hash'] not in self.processed_messages and m['_hash'] not in processed
+            and m['_hash'] not in unresolved
+        ]
         logger.info(f"Filtered {len(new_messages)} new messages from {len(messages)} total messages")
         return new_messages
@@ -0,0 +1,98 @@
+"""
+프로세스 내 메트릭 수집 모듈 (Prometheus 텍스트 포맷으로 노출)
+"""
+import threading
+from typing import Dict, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in key)
+    return "{" + inner + "}"
+
+
+class Metrics:
+    def __init__(self):
+        """카운터/게이지/요약(summary) 메트릭 저장소 초기화"""
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._summaries: Dict[str, Dict[LabelKey, Dict[str, float]]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """카운터를 증가시킵니다."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """게이지 값을 설정합니다."""
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = float(value)
+
+    def observe(self, name: str, value: float, **labels):
+        """관측값을 요약 메트릭(count/sum/max/last)에 기록합니다."""
+        key = _label_key(labels)
+        with self._lock:
+            summary = self._summaries.setdefault(name, {}).setdefault(
+                key, {"count": 0.0, "sum": 0.0, "max": 0.0, "last": 0.0}
+            )
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["max"] = max(summary["max"], value)
+            summary["last"] = value
+
+    def snapshot(self) -> Dict:
+        """현재 메트릭 값을 딕셔너리로 반환합니다."""
+        with self._lock:
+            return {
+                "counters": {n: {_format_labels(k): v for k, v in s.items()} for n, s in self._counters.items()},
+                "gauges": {n: {_format_labels(k): v for k, v in s.items()} for n, s in self._gauges.items()},
+                "summaries": {n: {_format_labels(k): dict(v) for k, v in s.items()} for n, s in self._summaries.items()},
+            }
+
+    def render(self) -> str:
+        """Prometheus 텍스트 포맷으로 직렬화합니다."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name, "counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._gauges.items()):
+                self._header(lines, name, "gauge")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._summaries.items()):
+                self._header(lines, name, "summary")
+                for key, summary in series.items():
+                    labels = _format_labels(key)
+                    lines.append(f"{name}_count{labels} {summary['count']}")
+                    lines.append(f"{name}_sum{labels} {summary['sum']}")
+                # max/last는 summary 표준 접미사가 아니므로 별도 게이지로 노출
+                for field in ("max", "last"):
+                    lines.append(f"# TYPE {name}_{field} gauge")
+                    for key, summary in series.items():
+                        lines.append(f"{name}_{field}{_format_labels(key)} {summary[field]}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines, name: str, metric_type: str):
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+
+metrics = Metrics()
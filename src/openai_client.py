@@ -9,13 +9,35 @@ from .config import config, BASE_DIR
 import openai
 import os
 import traceback
+from .resilience import get_breaker
+from .routing import load_prompt, DEFAULT_THREAD_SYSTEM_PROMPT
 
 logger = logging.getLogger(__name__)
 
+def _is_upstream_failure(e: Exception) -> bool:
+    """연결 오류/타임아웃/레이트 리밋/5xx만 OpenAI 장애로 간주합니다."""
+    return isinstance(e, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError))
+
+def _create_completion(client: OpenAI, **kwargs):
+    """서킷 브레이커/데드라인/재시도 정책을 적용해 chat completion을 요청합니다."""
+    breaker = get_breaker('openai', is_failure=_is_upstream_failure)
+    return breaker.call(
+        client.chat.completions.create,
+        timeout_kwarg='timeout',
+        default_timeout=config.OPENAI_TIMEOUT_SECONDS,
+        **kwargs
+    )
+
 class OpenAIClient:
     def __init__(self):
         """OpenAI 클라이언트 초기화"""
-        self.client = OpenAI(api_key=config.OPENAI_API_KEY)
+        # 재시도는 resilience 계층에서 예산 내로만 수행
+        self.client = OpenAI(
+            api_key=config.OPENAI_API_KEY,
+            base_url=config.OPENAI_BASE_URL,
+            max_retries=0,
+            timeout=config.OPENAI_TIMEOUT_SECONDS
+        )
         
         # 시스템 프롬프트 로드
         try:
@@ -26,13 +48,16 @@ class OpenAIClient:
             logger.error(f"Failed to load system prompt: {e}")
             self.system_prompt = "You are a helpful assistant for analyzing Slack messages and creating Jira tickets."
     
-    def analyze_message(self, message_text: str, user_name: str = "") -> Optional[Dict]:
+    def analyze_message(self, message_text: str, user_name: str = "",
+                        system_prompt: Optional[str] = None, model: Optional[str] = None) -> Optional[Dict]:
         """
         메시지를 분석하여 티켓 생성 필요성을 판단합니다.
         
         Args:
             message_text: 분석할 메시지 텍스트
             user_name: 메시지 작성자 이름
+            system_prompt: 채널별 시스템 프롬프트 (기본값: prompts/system_prompt.txt)
+            model: 채널별 모델 (기본값: OPENAI_MODEL)
             
         Returns:
             분석 결과 딕셔너리
@@ -45,10 +70,11 @@ class OpenAIClient:
 위 메시지를 분석하여 Jira 티켓 생성이 필요한지 판단하고, 필요하다면 티켓 정보를 생성해주세요.
 """
             
-            response = self.client.chat.completions.create(
-                model=config.OPENAI_MODEL,
+            response = _create_completion(
+                self.client,
+                model=model or config.OPENAI_MODEL,
                 messages=[
-                    {"role": "system", "content": self.system_prompt},
+                    {"role": "system", "content": system_prompt or self.system_prompt},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.1,
@@ -75,21 +101,23 @@ class OpenAIClient:
             logger.error(f"Failed to analyze message with OpenAI: {e}")
             return None
 
-    def analyze_thread_context(self, thread_context: str) -> Optional[Dict]:
+    def analyze_thread_context(self, thread_context: str, system_prompt: Optional[str] = None,
+                               model: Optional[str] = None) -> Optional[Dict]:
         """
         스레드 전체 대화문맥을 분석하여 티켓 생성 필요성을 판단합니다.
         Args:
             thread_context: 스레드 전체 대화문맥(문자열)
+            system_prompt: 채널별 스레드 시스템 프롬프트 (기본값: prompts/thread_system_prompt.txt)
+            model: 채널별 모델 (기본값: OPENAI_MODEL)
         Returns:
             분석 결과 딕셔너리
         """
         try:
-            prompt_path = os.path.join(BASE_DIR, 'prompts', 'thread_system_prompt.txt')
-            with open(prompt_path, 'r', encoding='utf-8') as f:
-                thread_system_prompt = f.read()
+            thread_system_prompt = system_prompt or load_prompt(DEFAULT_THREAD_SYSTEM_PROMPT)
             prompt = thread_context
-            response = self.client.chat.completions.create(
-                model=config.OPENAI_MODEL,
+            response = _create_completion(
+                self.client,
+                model=model or config.OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": thread_system_prompt},
                     {"role": "user", "content": prompt}
@@ -143,8 +171,14 @@ def classify_messages(messages: List[Dict], system_prompt: str, recent_tickets:
     logger = logging.getLogger(__name__)
     logger.info(f"OpenAI 프롬프트: {prompt}")
     try:
-        client = OpenAI(api_key=config.OPENAI_API_KEY)
-        completion = client.chat.completions.create(
+        client = OpenAI(
+            api_key=config.OPENAI_API_KEY,
+            base_url=config.OPENAI_BASE_URL,
+            max_retries=0,
+            timeout=config.OPENAI_TIMEOUT_SECONDS
+        )
+        completion = _create_completion(
+            client,
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -0,0 +1,270 @@
+"""
+업스트림(Slack/OpenAI/Jira) 호출 보호 모듈
+
+- 업스트림별 서킷 브레이커: 연속 실패 시 일정 시간 동안 호출을 즉시 실패시킴
+- 요청 단위 데드라인: contextvars로 호출 스택 아래까지 남은 시간을 전달
+- 지터가 포함된 재시도 + 재시도 예산: 장애 시 재시도가 부하를 증폭시키지 않도록 제한
+"""
+import contextvars
+import http.client
+import logging
+import random
+import socket
+import threading
+import time
+import urllib.error
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+import requests
+from .config import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+metrics.describe('workbot_upstream_calls_total', 'Upstream calls by upstream and outcome')
+metrics.describe('workbot_upstream_call_duration_seconds', 'Upstream call latency')
+metrics.describe('workbot_circuit_state', 'Circuit breaker state (0=closed, 1=half_open, 2=open)')
+
+
+# 업스트림 장애로 집계할 네트워크/타임아웃 예외 (TypeError/KeyError 같은 코드 오류는 제외)
+NETWORK_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    socket.gaierror,
+    urllib.error.URLError,
+    http.client.HTTPException,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+
+def is_network_error(e: Exception) -> bool:
+    """연결 실패/타임아웃 등 네트워크 계층 오류인지 판단합니다."""
+    return isinstance(e, NETWORK_ERRORS)
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출하지 않고 즉시 실패한 경우"""
+
+
+class DeadlineExceeded(Exception):
+    """요청 데드라인이 지나 업스트림 호출을 시작하지 않은 경우"""
+
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar('workbot_deadline', default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """
+    현재 컨텍스트에 데드라인을 설정합니다. 이미 더 짧은 데드라인이 있으면 그것을 유지합니다.
+
+    Args:
+        seconds: 지금부터 허용할 시간 (초). None이면 데드라인을 추가하지 않음
+    """
+    if seconds is None:
+        yield
+        return
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(new_deadline if current is None else min(current, new_deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """남은 시간(초)을 반환합니다. 데드라인이 없으면 None."""
+    current = _deadline.get()
+    if current is None:
+        return None
+    return max(0.0, current - time.monotonic())
+
+
+class RetryBudget:
+    def __init__(self, ratio: float, max_tokens: float = 10.0):
+        """
+        성공 호출마다 ratio만큼 토큰을 적립하고 재시도마다 1개를 소모하는 재시도 예산
+
+        Args:
+            ratio: 성공 호출 대비 허용할 재시도 비율
+            max_tokens: 적립 가능한 최대 토큰 수
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = None, reset_timeout: float = None,
+                 max_retries: int = None, retry_budget_ratio: float = None,
+                 is_failure: Callable[[Exception], bool] = None):
+        """
+        업스트림별 서킷 브레이커 초기화
+
+        Args:
+            name: 업스트림 이름 (slack/openai/jira)
+            failure_threshold: 서킷을 여는 연속 실패 횟수
+            reset_timeout: 서킷이 열린 뒤 half-open으로 전환하기까지의 시간 (초)
+            max_retries: 호출당 최대 재시도 횟수
+            retry_budget_ratio: 성공 호출 대비 허용할 재시도 비율
+            is_failure: 업스트림 장애로 간주할 예외인지 판별하는 함수 (True인 경우만 실패 집계/재시도)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold or config.BREAKER_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or config.BREAKER_RESET_SECONDS
+        self.max_retries = config.RETRY_MAX_ATTEMPTS if max_retries is None else max_retries
+        self.budget = RetryBudget(config.RETRY_BUDGET_RATIO if retry_budget_ratio is None else retry_budget_ratio)
+        self.is_failure = is_failure or (lambda e: True)
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        metrics.set_gauge('workbot_circuit_state', _STATE_VALUES[CLOSED], upstream=name)
+
+    def allow(self) -> bool:
+        """호출 가능 여부를 반환합니다. half-open 상태에서는 한 번에 하나의 시험 호출만 허용합니다."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+        self.budget.deposit()
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def release(self):
+        """장애로 집계하지 않는 결과(클라이언트 오류 등)로 끝난 호출의 시험 슬롯을 반납합니다."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _transition(self, state: str):
+        if state != self.state:
+            logger.warning(f"Circuit '{self.name}' {self.state} -> {state}")
+        self.state = state
+        metrics.set_gauge('workbot_circuit_state', _STATE_VALUES[state], upstream=self.name)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            state = self.state
+            if state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                state = HALF_OPEN
+            return {
+                'state': state,
+                'consecutive_failures': self.failures,
+                'retry_tokens': round(self.budget.tokens, 2)
+            }
+
+    def call(self, fn: Callable, *args, timeout_kwarg: Optional[str] = None,
+             default_timeout: Optional[float] = None, idempotent: bool = True, **kwargs):
+        """
+        서킷 브레이커, 데드라인, 재시도 정책을 적용해 업스트림 함수를 호출합니다.
+
+        Args:
+            fn: 호출할 업스트림 함수
+            timeout_kwarg: 호출별 타임아웃을 지원하는 경우 해당 키워드 인자 이름 (남은 데드라인으로 설정)
+            default_timeout: 데드라인이 없을 때 사용할 호출별 타임아웃 (초)
+            idempotent: False이면 재시도하지 않음 (메시지 전송/티켓 생성 등 중복 위험이 있는 호출)
+
+        Raises:
+            CircuitOpenError: 서킷이 열려 있는 경우
+            DeadlineExceeded: 호출 전에 데드라인이 지난 경우
+        """
+        attempt = 0
+        while True:
+            left = remaining()
+            if left is not None and left <= 0:
+                metrics.inc('workbot_upstream_calls_total', upstream=self.name, outcome='deadline')
+                raise DeadlineExceeded(f"{self.name} call skipped: deadline exceeded")
+            if not self.allow():
+                metrics.inc('workbot_upstream_calls_total', upstream=self.name, outcome='circuit_open')
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            if timeout_kwarg:
+                timeout = default_timeout if left is None else (min(left, default_timeout) if default_timeout else left)
+                if timeout is not None:
+                    kwargs[timeout_kwarg] = timeout
+            started = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                metrics.observe('workbot_upstream_call_duration_seconds', time.monotonic() - started, upstream=self.name)
+                if not self.is_failure(e):
+                    self.release()
+                    metrics.inc('workbot_upstream_calls_total', upstream=self.name, outcome='client_error')
+                    raise
+                self.record_failure()
+                metrics.inc('workbot_upstream_calls_total', upstream=self.name, outcome='failure')
+                if not idempotent or attempt >= self.max_retries or not self.budget.withdraw():
+                    raise
+                attempt += 1
+                # full jitter 지수 백오프, 남은 데드라인을 넘기지 않음
+                backoff = random.uniform(0, min(config.RETRY_MAX_BACKOFF_SECONDS, 0.2 * (2 ** attempt)))
+                left = remaining()
+                if left is not None and backoff >= left:
+                    raise
+                logger.warning(f"{self.name} call failed ({e}), retry {attempt}/{self.max_retries} in {backoff:.2f}s")
+                time.sleep(backoff)
+                continue
+            metrics.observe('workbot_upstream_call_duration_seconds', time.monotonic() - started, upstream=self.name)
+            metrics.inc('workbot_upstream_calls_total', upstream=self.name, outcome='success')
+            self.record_success()
+            return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """이름별 공유 서킷 브레이커를 반환합니다. (클라이언트 인스턴스가 여러 개여도 상태를 공유)"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, **kwargs)
+            _breakers[name] = breaker
+        return breaker
+
+
+def breaker_states() -> Dict[str, Dict]:
+    """등록된 모든 서킷 브레이커의 상태를 반환합니다."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot() for b in breakers}
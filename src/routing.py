@@ -0,0 +1,189 @@
+"""
+채널 라우팅 및 채널별 작업 격리 모듈
+
+채널마다 Jira 프로젝트, 프롬프트, 모델, 동시 처리 한도를 지정합니다.
+라우팅 설정은 CHANNEL_ROUTES_PATH(JSON 파일) 또는 CHANNEL_ROUTES(JSON 문자열)로 주며,
+둘 다 없으면 기존 SLACK_CHANNEL_ID / JIRA_PROJECT_KEY / OPENAI_MODEL 단일 채널로 동작합니다.
+
+예시:
+    {
+      "C0123": {"jira_project_key": "SOM", "model": "gpt-4.1-mini", "concurrency": 4},
+      "C0456": {"jira_project_key": "ADM", "system_prompt": "prompts/admin_system_prompt.txt"}
+    }
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+from .config import config, BASE_DIR
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYSTEM_PROMPT = os.path.join('prompts', 'system_prompt.txt')
+DEFAULT_THREAD_SYSTEM_PROMPT = os.path.join('prompts', 'thread_system_prompt.txt')
+
+metrics.describe('workbot_channel_pending_tasks', 'Queued or running tasks per channel partition')
+metrics.describe('workbot_channel_rejected_tasks_total', 'Tasks rejected because the channel queue was full')
+metrics.describe('workbot_channel_task_errors_total', 'Channel worker tasks that raised an exception')
+
+
+@lru_cache(maxsize=None)
+def load_prompt(path: str) -> str:
+    """프롬프트 파일을 읽어 캐시합니다. (상대 경로는 프로젝트 루트 기준)"""
+    full_path = path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+    with open(full_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class ChannelRoute:
+    def __init__(self, channel_id: str, jira_project_key: str, model: str = None,
+                 system_prompt: str = None, thread_system_prompt: str = None,
+                 concurrency: int = None, max_pending: int = None, partition: str = None):
+        """
+        Args:
+            channel_id: Slack 채널 ID
+            jira_project_key: 티켓을 생성할 Jira 프로젝트 키
+            model: 분석에 사용할 OpenAI 모델
+            system_prompt: 단일 메시지 분석 프롬프트 파일 경로
+            thread_system_prompt: 스레드 분석 프롬프트 파일 경로
+            concurrency: 채널 전용 워커 수
+            max_pending: 채널 큐에 쌓일 수 있는 최대 작업 수 (초과분은 거절)
+            partition: 작업을 실행할 워커 파티션 이름 (기본값: channel_id)
+        """
+        self.channel_id = channel_id
+        self.jira_project_key = jira_project_key
+        self.model = model or config.OPENAI_MODEL
+        self.system_prompt_path = system_prompt or DEFAULT_SYSTEM_PROMPT
+        self.thread_system_prompt_path = thread_system_prompt or DEFAULT_THREAD_SYSTEM_PROMPT
+        self.concurrency = concurrency or config.CHANNEL_CONCURRENCY
+        self.max_pending = max_pending or config.CHANNEL_MAX_PENDING
+        self.partition = partition or channel_id
+
+    @property
+    def system_prompt(self) -> str:
+        return load_prompt(self.system_prompt_path)
+
+    @property
+    def thread_system_prompt(self) -> str:
+        return load_prompt(self.thread_system_prompt_path)
+
+    def for_channel(self, channel_id: str) -> 'ChannelRoute':
+        """
+        같은 설정과 같은 워커 파티션을 쓰는 다른 채널용 라우트를 만듭니다. (라우팅 테이블에 없는 채널의 멘션 처리용)
+        미등록 채널마다 워커 풀이 늘어나지 않도록 파티션은 공유합니다.
+        """
+        return ChannelRoute(
+            channel_id, self.jira_project_key, self.model, self.system_prompt_path,
+            self.thread_system_prompt_path, self.concurrency, self.max_pending, self.partition
+        )
+
+    def __repr__(self):
+        return f"ChannelRoute({self.channel_id} -> {self.jira_project_key}, model={self.model})"
+
+
+class RoutingTable:
+    def __init__(self, routes: List[ChannelRoute]):
+        """채널 ID -> ChannelRoute 매핑 (첫 번째 라우트가 미등록 채널의 기본 설정)"""
+        self._routes: Dict[str, ChannelRoute] = {r.channel_id: r for r in routes}
+        self._default = routes[0] if routes else None
+
+    def routes(self) -> List[ChannelRoute]:
+        """폴링 대상 채널 라우트 목록"""
+        return list(self._routes.values())
+
+    def resolve(self, channel_id: Optional[str]) -> Optional[ChannelRoute]:
+        """
+        채널의 라우트를 반환합니다.
+        등록되지 않은 채널은 기본 설정을 복사하고 기본 채널의 워커 파티션을 공유하는 라우트를 반환합니다.
+        (요청마다 새로 만들며 보관하지 않으므로 미등록 채널 수만큼 상태가 늘어나지 않음)
+        """
+        if not channel_id:
+            return self._default
+        route = self._routes.get(channel_id)
+        if route or not self._default:
+            return route
+        return self._default.for_channel(channel_id)
+
+
+def load_routing_table() -> RoutingTable:
+    """설정에서 라우팅 테이블을 읽어옵니다."""
+    raw = None
+    if config.CHANNEL_ROUTES_PATH:
+        with open(config.CHANNEL_ROUTES_PATH, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+    elif config.CHANNEL_ROUTES:
+        raw = json.loads(config.CHANNEL_ROUTES)
+    if not raw:
+        if not config.SLACK_CHANNEL_ID:
+            return RoutingTable([])
+        return RoutingTable([ChannelRoute(config.SLACK_CHANNEL_ID, config.JIRA_PROJECT_KEY)])
+    routes = []
+    for channel_id, options in raw.items():
+        options = dict(options)
+        project_key = options.pop('jira_project_key', None) or config.JIRA_PROJECT_KEY
+        routes.append(ChannelRoute(channel_id, project_key, **options))
+    logger.info(f"Loaded {len(routes)} channel routes: {routes}")
+    return RoutingTable(routes)
+
+
+class ChannelWorkers:
+    def __init__(self):
+        """
+        파티션별 전용 스레드 풀 (한 채널의 작업이 다른 채널의 워커를 점유하지 못하도록 격리)
+        파티션은 라우팅 테이블에 등록된 채널마다 하나이며, 미등록 채널은 기본 채널 파티션을 공유합니다.
+        """
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._pending: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, route: ChannelRoute, fn: Callable, *args, **kwargs) -> Optional[Future]:
+        """
+        라우트의 워커 파티션에 작업을 제출합니다. 현재 컨텍스트(데드라인 등)를 그대로 전달합니다.
+
+        Returns:
+            Future, 채널 큐가 가득 차 거절된 경우 None
+        """
+        partition = route.partition
+        with self._lock:
+            pending = self._pending.get(partition, 0)
+            if pending >= route.max_pending:
+                metrics.inc('workbot_channel_rejected_tasks_total', channel=partition)
+                logger.warning(f"Channel partition {partition} queue full ({pending}), rejecting task for {route.channel_id}")
+                return None
+            pool = self._pools.get(partition)
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=route.concurrency, thread_name_prefix=f"channel-{partition}")
+                self._pools[partition] = pool
+            self._pending[partition] = pending + 1
+            metrics.set_gauge('workbot_channel_pending_tasks', pending + 1, channel=partition)
+        ctx = contextvars.copy_context()
+        future = pool.submit(ctx.run, fn, *args, **kwargs)
+        future.add_done_callback(lambda f: self._done(partition, f, getattr(fn, '__name__', repr(fn))))
+        return future
+
+    def _done(self, partition: str, future: Future, task_name: str):
+        # 호출 측은 Future를 기다리지 않으므로 작업 예외는 여기서 기록
+        if not future.cancelled() and future.exception() is not None:
+            error = future.exception()
+            metrics.inc('workbot_channel_task_errors_total', channel=partition)
+            logger.error(f"Task {task_name} failed on channel partition {partition}: {error}",
+                         exc_info=(type(error), error, error.__traceback__))
+        with self._lock:
+            self._pending[partition] -= 1
+            metrics.set_gauge('workbot_channel_pending_tasks', self._pending[partition], channel=partition)
+
+    def pending(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._pending)
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=wait)
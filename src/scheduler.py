@@ -1,35 +1,307 @@
-# from apscheduler.schedulers.background import BackgroundScheduler
-# import logging
-# from .slack_client import SlackClient
-# from .message_processor import MessageProcessor, extract_ticket_candidates
-
-# logger = logging.getLogger(__name__)
-
-# slack = SlackClient()
-# processor = MessageProcessor()
-
-# scheduler = BackgroundScheduler()
-
-# def scheduled_message_processing():
-#     messages = slack.get_recent_messages(minutes=120)
-#     new_messages = processor.filter_new_messages(messages)
-#     if not new_messages:
-#         logger.info("No new messages to process.")
-#         return
-#     candidates = extract_ticket_candidates(new_messages)
-#     logger.info(f"티켓 후보: {candidates}")
-#     for candidate in candidates:
-#         if candidate.get('is_duplicate'):
-#             logger.info(f"중복 티켓으로 판단되어 생성하지 않음: {candidate.get('duplicate_reason', '')}")
-#             continue
-#         orig = next((m for m in new_messages if m.get('_hash') == candidate.get('_hash')), None)
-#         logger.info(f"send_approval_message 호출 전: {candidate}")
-#         result = slack.send_approval_message(candidate['ticket_info'], orig)
-#         logger.info(f"send_approval_message 호출 후: {result}")
-#         if orig:
-#             processor.mark_message_processed(orig['_hash'], orig)
-
-# scheduler.add_job(scheduled_message_processing, 'interval', minutes=1)  
-
-# def start_scheduler():
-#     scheduler.start() 
\ No newline at end of file
+"""
+메시지 폴링 스케줄러 모듈
+
+여러 uvicorn 레플리카가 떠 있어도 리스(lease)를 가진 한 인스턴스만 process_messages를 실행합니다.
+리스 백엔드는 REDIS_URL이 설정되어 있고 redis 패키지가 설치되어 있으면 Redis, 아니면 DynamoDB 조건부 쓰기를 사용합니다.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Optional
+import boto3
+from botocore.exceptions import ClientError
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.events import EVENT_JOB_SUBMITTED, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_ERROR
+from .config import config
+from .metrics import metrics
+from .resilience import deadline
+
+logger = logging.getLogger(__name__)
+
+JOB_ID = 'process_messages'
+LEASE_NAME = 'scheduler:process_messages'
+
+metrics.describe('workbot_scheduler_lag_seconds', 'Delay between scheduled and actual job start')
+metrics.describe('workbot_scheduler_run_duration_seconds', 'Duration of a process_messages run')
+metrics.describe('workbot_scheduler_interval_seconds', 'Current polling interval')
+metrics.describe('workbot_scheduler_is_leader', '1 if this instance holds the scheduler lease')
+metrics.describe('workbot_scheduler_runs_total', 'process_messages runs by outcome')
+
+
+def _default_owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class DynamoDBLease:
+    def __init__(self, owner_id: str, lease_seconds: int, table_name: str = None, name: str = LEASE_NAME):
+        """DynamoDB 조건부 쓰기 기반 리더 리스"""
+        self.owner_id = owner_id
+        self.lease_seconds = lease_seconds
+        self.name = name
+        self.last_error: Optional[str] = None
+        dynamodb = boto3.resource('dynamodb', region_name=config.AWS_REGION)
+        self.table = dynamodb.Table(table_name or config.SCHEDULER_LEASE_TABLE_NAME)
+
+    def check(self):
+        """리스 테이블에 접근할 수 있는지 확인합니다. (테이블이 없으면 ResourceNotFoundException 발생)"""
+        self.table.get_item(Key={'lease_name': self.name})
+
+    def acquire(self) -> bool:
+        """
+        리스를 획득하거나 갱신합니다. 다른 인스턴스가 유효한 리스를 가지고 있으면 False를 반환합니다.
+        경합에서 진 것이 아니라 백엔드 오류로 실패한 경우 last_error에 원인을 남깁니다.
+        """
+        now = int(time.time())
+        expires_at = now + self.lease_seconds
+        try:
+            self.table.put_item(
+                Item={
+                    'lease_name': self.name,
+                    'owner': self.owner_id,
+                    'expires_at': expires_at,
+                    'ttl': expires_at + 3600
+                },
+                ConditionExpression='attribute_not_exists(lease_name) OR expires_at < :now OR #owner = :owner',
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues={':now': now, ':owner': self.owner_id}
+            )
+            self.last_error = None
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                self.last_error = None
+                return False
+            logger.error(f"Failed to acquire scheduler lease: {e}")
+            self.last_error = str(e)
+        except Exception as e:
+            logger.error(f"Failed to acquire scheduler lease: {e}")
+            self.last_error = str(e)
+        return False
+
+    def release(self):
+        """보유 중인 리스를 반납합니다."""
+        try:
+            self.table.delete_item(
+                Key={'lease_name': self.name},
+                ConditionExpression='#owner = :owner',
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues={':owner': self.owner_id}
+            )
+        except Exception as e:
+            logger.debug(f"Scheduler lease release skipped: {e}")
+
+
+class RedisLease:
+    # 소유자가 같을 때만 만료 시간을 연장 (원자적 비교 후 갱신)
+    _RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+    _RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+    def __init__(self, owner_id: str, lease_seconds: int, url: str = None, name: str = LEASE_NAME):
+        """Redis SET NX PX 기반 리더 리스"""
+        import redis  # 선택 의존성: REDIS_URL을 쓰는 배포에서만 필요
+        self.owner_id = owner_id
+        self.lease_seconds = lease_seconds
+        self.name = name
+        self.last_error: Optional[str] = None
+        self.redis = redis.Redis.from_url(url or config.REDIS_URL)
+
+    def check(self):
+        """Redis에 접속할 수 있는지 확인합니다."""
+        self.redis.ping()
+
+    def acquire(self) -> bool:
+        ttl_ms = self.lease_seconds * 1000
+        try:
+            if self.redis.set(self.name, self.owner_id, nx=True, px=ttl_ms):
+                acquired = True
+            else:
+                acquired = bool(self.redis.eval(self._RENEW_SCRIPT, 1, self.name, self.owner_id, ttl_ms))
+            self.last_error = None
+            return acquired
+        except Exception as e:
+            logger.error(f"Failed to acquire scheduler lease: {e}")
+            self.last_error = str(e)
+            return False
+
+    def release(self):
+        try:
+            self.redis.eval(self._RELEASE_SCRIPT, 1, self.name, self.owner_id)
+        except Exception as e:
+            logger.debug(f"Scheduler lease release skipped: {e}")
+
+
+def create_lease(owner_id: Optional[str] = None, lease_seconds: Optional[int] = None):
+    """설정에 맞는 리스 백엔드를 생성합니다."""
+    owner_id = owner_id or _default_owner_id()
+    lease_seconds = lease_seconds or config.SCHEDULER_LEASE_SECONDS
+    if config.REDIS_URL:
+        try:
+            return RedisLease(owner_id, lease_seconds)
+        except ImportError:
+            # REDIS_URL은 기존 설정에도 있던 값이라 redis 패키지 없이 배포된 환경이 있을 수 있음
+            logger.warning("REDIS_URL is set but the redis package is not installed, using DynamoDB lease")
+    return DynamoDBLease(owner_id, lease_seconds)
+
+
+class PollingScheduler:
+    def __init__(self, job: Callable[[], Optional[Dict]], lease=None,
+                 min_interval: int = None, max_interval: int = None):
+        """
+        단일 리더 폴링 스케줄러 초기화
+
+        Args:
+            job: 주기적으로 실행할 함수 (결과 딕셔너리의 'new_messages' 값으로 주기를 조절)
+            lease: acquire()/release()를 제공하는 리스 객체
+            min_interval: 최소 폴링 주기 (초)
+            max_interval: 최대 폴링 주기 (초)
+        """
+        self.job = job
+        self.lease = lease if lease is not None else create_lease()
+        self.min_interval = min_interval or config.SCHEDULER_MIN_INTERVAL_SECONDS
+        self.max_interval = max_interval or config.SCHEDULER_MAX_INTERVAL_SECONDS
+        # 메시지 조회 범위와 같은 주기까지 늘어나면 미뤄진 메시지가 다음 폴링 전에 범위를 벗어나므로
+        # 한 번의 최소 주기만큼 여유를 두고 상한을 제한
+        lookback_seconds = config.MESSAGE_LOOKBACK_MINUTES * 60
+        max_allowed = max(1, lookback_seconds - self.min_interval)
+        if self.max_interval > max_allowed:
+            logger.warning(
+                f"SCHEDULER_MAX_INTERVAL_SECONDS({self.max_interval}) must stay below message lookback "
+                f"({lookback_seconds}s) minus min interval ({self.min_interval}s), capping to {max_allowed}s"
+            )
+            self.max_interval = max_allowed
+        self.min_interval = min(self.min_interval, self.max_interval)
+        self.interval = self.min_interval
+        self.is_leader = False
+        self._run_lock = threading.Lock()
+        self.scheduler = BackgroundScheduler()
+        self.scheduler.add_listener(self._on_job_event, EVENT_JOB_SUBMITTED | EVENT_JOB_MAX_INSTANCES | EVENT_JOB_ERROR)
+
+    def start(self):
+        """
+        리스 갱신 작업과 폴링 작업을 등록하고 스케줄러를 시작합니다.
+
+        Raises:
+            RuntimeError: 리스 백엔드(테이블/Redis)에 접근할 수 없는 경우
+                (리더가 될 수 없어 폴링이 조용히 멈추는 상태로 뜨지 않도록 기동을 실패시킴)
+        """
+        try:
+            self.lease.check()
+        except Exception as e:
+            raise RuntimeError(f"Scheduler lease backend is not available: {e}") from e
+        heartbeat_seconds = max(1, self.lease.lease_seconds // 3)
+        self.scheduler.add_job(
+            self._renew_lease, 'interval', seconds=heartbeat_seconds,
+            id='scheduler_lease', max_instances=1, coalesce=True, next_run_time=datetime.now()
+        )
+        self.scheduler.add_job(
+            self._run, 'interval', seconds=self.interval,
+            id=JOB_ID, max_instances=1, coalesce=True, misfire_grace_time=self.min_interval
+        )
+        metrics.set_gauge('workbot_scheduler_interval_seconds', self.interval)
+        self.scheduler.start()
+        logger.info(f"Scheduler started (interval={self.interval}s, lease_owner={self.lease.owner_id})")
+
+    def shutdown(self):
+        """스케줄러를 중지하고 리스를 반납합니다."""
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        if self.is_leader:
+            self.lease.release()
+            self._set_leader(False)
+
+    def status(self) -> Dict:
+        """헬스 체크용 상태 (lease_error가 있으면 경합이 아닌 백엔드 오류로 리더가 되지 못하고 있음)"""
+        return {
+            'is_leader': self.is_leader,
+            'interval_seconds': self.interval,
+            'lease_error': getattr(self.lease, 'last_error', None)
+        }
+
+    def run_once(self) -> Optional[Dict]:
+        """리스를 획득한 경우에만 작업을 한 번 실행합니다. (Lambda 등 단발성 실행용)"""
+        self._renew_lease()
+        return self._run()
+
+    def _set_leader(self, is_leader: bool):
+        if is_leader != self.is_leader:
+            logger.info(f"Scheduler leadership {'acquired' if is_leader else 'lost'} ({self.lease.owner_id})")
+        self.is_leader = is_leader
+        metrics.set_gauge('workbot_scheduler_is_leader', 1 if is_leader else 0)
+
+    def _renew_lease(self):
+        self._set_leader(self.lease.acquire())
+
+    def _run(self) -> Optional[Dict]:
+        if not self.is_leader:
+            logger.debug("Not the scheduler leader, skipping run")
+            metrics.inc('workbot_scheduler_runs_total', outcome='not_leader')
+            return None
+        # 스케줄 실행과 run_once가 겹치는 경우까지 막기 위해 잠금을 비차단으로 획득
+        if not self._run_lock.acquire(blocking=False):
+            logger.warning("Previous process_messages run still in progress, skipping")
+            metrics.inc('workbot_scheduler_runs_total', outcome='overlap')
+            return None
+        started = time.monotonic()
+        try:
+            # 다음 틱 전에 끝나도록 현재 폴링 주기를 데드라인으로 전달
+            with deadline(self.interval):
+                result = self.job()
+            metrics.inc('workbot_scheduler_runs_total', outcome='success')
+            self._adjust_interval(result)
+            return result
+        except Exception as e:
+            logger.error(f"Scheduled process_messages failed: {e}")
+            metrics.inc('workbot_scheduler_runs_total', outcome='error')
+            return None
+        finally:
+            metrics.observe('workbot_scheduler_run_duration_seconds', time.monotonic() - started)
+            self._run_lock.release()
+
+    def _adjust_interval(self, result: Optional[Dict]):
+        """
+        새 메시지가 있으면 최소 주기로, 없으면 주기를 두 배씩 늘려 최대 주기까지 완화합니다.
+
+        분석 성공 건수가 아니라 새 메시지 수를 기준으로 하므로, OpenAI 장애 등으로 처리가 미뤄진
+        메시지가 남아 있는 동안에는 주기를 늘리지 않습니다.
+        """
+        result = result or {}
+        new_messages = result.get('new_messages', result.get('processed', 0))
+        if new_messages > 0:
+            new_interval = self.min_interval
+        else:
+            new_interval = min(self.interval * 2, self.max_interval)
+        if new_interval == self.interval:
+            return
+        logger.info(f"Adjusting polling interval {self.interval}s -> {new_interval}s (new_messages={new_messages})")
+        self.interval = new_interval
+        metrics.set_gauge('workbot_scheduler_interval_seconds', new_interval)
+        if self.scheduler.running:
+            self.scheduler.reschedule_job(JOB_ID, trigger='interval', seconds=new_interval)
+
+    def _on_job_event(self, event):
+        if event.job_id != JOB_ID:
+            return
+        if event.code == EVENT_JOB_SUBMITTED:
+            scheduled = event.scheduled_run_times[0] if event.scheduled_run_times else None
+            if scheduled:
+                lag = (datetime.now(scheduled.tzinfo) - scheduled).total_seconds()
+                metrics.observe('workbot_scheduler_lag_seconds', max(lag, 0.0))
+        elif event.code == EVENT_JOB_MAX_INSTANCES:
+            logger.warning("process_messages still running at next tick, run skipped")
+            metrics.inc('workbot_scheduler_runs_total', outcome='overlap')
+        elif event.code == EVENT_JOB_ERROR:
+            logger.error(f"Scheduler job raised: {event.exception}")
@@ -11,22 +11,42 @@ from slack_sdk.errors import SlackApiError
 from .config import config
 import os
 from .jira_client import JiraClient
+from .resilience import get_breaker, is_network_error
 import traceback
 
 logger = logging.getLogger(__name__)
 
+def _is_upstream_failure(e: Exception) -> bool:
+    """레이트 리밋/5xx/네트워크 오류만 Slack 장애로 간주합니다. (channel_not_found, 코드 오류 등은 제외)"""
+    if isinstance(e, SlackApiError):
+        status = getattr(e.response, 'status_code', 200)
+        return status == 429 or status >= 500
+    return is_network_error(e)
+
 class SlackClient:
     def __init__(self):
-        self.client = WebClient(token=config.SLACK_BOT_TOKEN)
-        self.app = App(token=config.SLACK_BOT_TOKEN, signing_secret=config.SLACK_SIGNING_SECRET)
+        self.client = WebClient(
+            token=config.SLACK_BOT_TOKEN,
+            base_url=config.SLACK_API_URL,
+            timeout=config.SLACK_TIMEOUT_SECONDS,
+            # 재시도는 브레이커의 재시도 예산/멱등성 정책으로만 수행 (SDK 기본 연결 오류 재시도 비활성화)
+            retry_handlers=[]
+        )
+        self.app = App(client=self.client, signing_secret=config.SLACK_SIGNING_SECRET)
         self.jira = JiraClient()
+        self.breaker = get_breaker('slack', is_failure=_is_upstream_failure)
+
+    def _call(self, method: str, idempotent: bool = True, **kwargs):
+        """서킷 브레이커/데드라인/재시도 정책을 적용해 Web API를 호출합니다."""
+        return self.breaker.call(getattr(self.client, method), idempotent=idempotent, **kwargs)
         
-    def get_recent_messages(self, minutes: int = 5) -> List[Dict]:
+    def get_recent_messages(self, minutes: int = 5, channel: Optional[str] = None) -> List[Dict]:
         """
         최근 n분간의 메시지를 가져옵니다.
         
         Args:
             minutes: 조회할 시간 범위 (분)
+            channel: 조회할 채널 ID (기본값: SLACK_CHANNEL_ID)
             
         Returns:
             메시지 리스트
@@ -35,10 +55,12 @@ class SlackClient:
             # 현재 시간에서 minutes만큼 뺀 시간을 타임스탬프로 변환
             oldest = datetime.now() - timedelta(minutes=minutes)
             oldest_ts = oldest.timestamp()
+            channel = channel or config.SLACK_CHANNEL_ID
             
             # 채널 히스토리 조회
-            response = self.client.conversations_history(
-                channel=config.SLACK_CHANNEL_ID,
+            response = self._call(
+                'conversations_history',
+                channel=channel,
                 oldest=str(oldest_ts),
                 limit=100
             )
@@ -55,6 +77,7 @@ class SlackClient:
                         "user": message.get("user", "unknown"),
                         "text": message.get("text", ""),
                         "thread_ts": message.get("thread_ts"),
+                        "channel": channel,
                         "timestamp": datetime.fromtimestamp(float(message["ts"]))
                     })
                     
@@ -64,19 +87,25 @@ class SlackClient:
             logger.error(f"Failed to get recent messages: {e}")
             return []
     
-    def send_approval_message(self, ticket_info: Dict, original_message: Dict) -> Optional[str]:
+    def send_approval_message(self, ticket_info: Dict, original_message: Dict,
+                              channel: Optional[str] = None, project_key: Optional[str] = None) -> Optional[str]:
         """
         티켓 생성 승인을 요청하는 인터랙티브 메시지를 전송합니다.
         
         Args:
             ticket_info: 생성할 티켓 정보
             original_message: 원본 메시지 정보
+            channel: 승인 요청을 보낼 채널 ID (기본값: 원본 메시지 채널, 없으면 SLACK_CHANNEL_ID)
+            project_key: 승인 시 티켓을 생성할 Jira 프로젝트 키 (버튼 값에 함께 담김)
             
         Returns:
             전송된 메시지의 타임스탬프
         """
         try:
             logger.info(f"슬랙 티켓 생성 요청 메시지 전송 시도: {ticket_info['summary']}")
+            channel = channel or (original_message or {}).get('channel') or config.SLACK_CHANNEL_ID
+            if project_key:
+                ticket_info = dict(ticket_info, project_key=project_key)
             blocks = [
                 {
                     "type": "section",
@@ -111,8 +140,10 @@ class SlackClient:
                     ]
                 }
             ]
-            response = self.client.chat_postMessage(
-                channel=config.SLACK_CHANNEL_ID,
+            response = self._call(
+                'chat_postMessage',
+                idempotent=False,
+                channel=channel,
                 blocks=blocks,
                 text="티켓 생성 요청"
             )
@@ -125,10 +156,19 @@ class SlackClient:
             logger.error(f"Failed to send approval message: {e}\n{traceback.format_exc()}")
         return None
     
+    def send_ephemeral(self, channel: str, user: str, text: str) -> bool:
+        """특정 사용자에게만 보이는 안내 메시지를 전송합니다."""
+        try:
+            response = self._call('chat_postEphemeral', idempotent=False, channel=channel, user=user, text=text)
+            return bool(response["ok"])
+        except Exception as e:
+            logger.error(f"Failed to send ephemeral message: {e}")
+        return False
+
     def get_user_info(self, user_id: str) -> Optional[str]:
         """사용자 정보를 가져옵니다."""
         try:
-            response = self.client.users_info(user=user_id)
+            response = self._call('users_info', user=user_id)
             if response["ok"]:
                 return response["user"]["real_name"] or response["user"]["name"]
         except Exception as e:
@@ -151,7 +191,8 @@ class SlackClient:
                     description=ticket_info['description'],
                     issue_type=ticket_info.get('issue_type', '작업'),
                     assignee=ticket_info.get('assignee'),
-                    priority=ticket_info.get('priority')
+                    priority=ticket_info.get('priority'),
+                    project_key=ticket_info.get('project_key')
                 )
                 channel_id = payload.get('channel', {}).get('id')
                 user_id = payload.get('user', {}).get('id')
@@ -160,7 +201,8 @@ class SlackClient:
                     jira_url = f"https://{config.JIRA_SERVER.replace('https://', '')}/browse/{issue_key}"
                     assignee = ticket_info.get('assignee', '')
                     update_text = f"[{assignee}] Jira 티켓이 생성되었습니다: {issue_key} (<{jira_url}|링크>)"
-                    self.client.chat_update(
+                    self._call(
+                        'chat_update',
                         channel=channel_id,
                         ts=message_ts,
                         text=update_text,
@@ -176,7 +218,8 @@ class SlackClient:
                 channel_id = payload.get('channel', {}).get('id')
                 message_ts = payload.get('message', {}).get('ts')
                 if channel_id and message_ts:
-                    self.client.chat_delete(
+                    self._call(
+                        'chat_delete',
                         channel=channel_id,
                         ts=message_ts
                     )
@@ -188,10 +231,11 @@ class SlackClient:
             logger.error(f"Failed to handle interaction: {e}\n{traceback.format_exc()}")
             return {"ok": False, "error": str(e)}
 
-    def get_thread_context(self, thread_ts: str) -> Optional[str]:
+    def get_thread_context(self, thread_ts: str, channel: Optional[str] = None) -> Optional[str]:
         try:
-            response = self.client.conversations_replies(
-                channel=config.SLACK_CHANNEL_ID,
+            response = self._call(
+                'conversations_replies',
+                channel=channel or config.SLACK_CHANNEL_ID,
                 ts=thread_ts,
                 limit=100
             )
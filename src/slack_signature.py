@@ -0,0 +1,129 @@
+"""
+Slack 요청 서명 검증 / 재시도 차단 ASGI 미들웨어
+
+- X-Slack-Retry-Reason이 http_timeout인 이벤트 재시도는 본문을 읽기 전에 바로 200으로 응답합니다.
+  (우리 쪽 ack가 늦어서 생긴 재시도이므로 원본 요청이 이미 처리 중임)
+  http_error / connection_failed 등 원본이 처리되지 않았을 수 있는 재시도는 검증 후 앱으로 전달하고,
+  중복 여부는 앱의 event_id 중복 제거에 맡깁니다.
+- X-Slack-Signature는 원본 바디 바이트에 대해 HMAC-SHA256을 계산하고 상수 시간 비교로 검증합니다.
+- signing secret이 설정되지 않은 경우 검증 대상 요청을 모두 401로 거절합니다.
+- 검증을 위해 버퍼링한 바디는 다시 파싱하지 않고 그대로 하위 앱의 receive로 전달합니다.
+"""
+import hashlib
+import hmac
+import logging
+import time
+from typing import Iterable, Optional
+from .config import config
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Slack 권장: 5분보다 오래된 요청은 재전송 공격으로 간주
+MAX_TIMESTAMP_SKEW_SECONDS = 60 * 5
+
+# 원본 요청이 이미 수신되어 처리 중인 재시도 사유 (그 외 사유는 원본이 유실되었을 수 있음)
+ACKED_RETRY_REASONS = frozenset({b'http_timeout'})
+
+metrics.describe('workbot_slack_edge_requests_total', 'Slack requests handled at the edge by outcome')
+
+
+def compute_signature(secret: bytes, timestamp: bytes, body: bytes) -> bytes:
+    """Slack 서명 문자열(v0=hex)을 계산합니다."""
+    mac = hmac.new(secret, b'v0:' + timestamp + b':' + body, hashlib.sha256)
+    return b'v0=' + mac.hexdigest().encode('ascii')
+
+
+class SlackSignatureMiddleware:
+    def __init__(self, app, signing_secret: Optional[str] = None, path_prefix: str = '/slack',
+                 retry_paths: Iterable[str] = ('/slack/event',), drop_retries: bool = None):
+        """
+        Args:
+            app: 하위 ASGI 앱
+            signing_secret: Slack signing secret (기본값: config.SLACK_SIGNING_SECRET)
+            path_prefix: 검증 대상 경로 접두사 (POST 요청만 검증)
+            retry_paths: http_timeout 재시도 요청을 즉시 ack할 경로
+            drop_retries: http_timeout 재시도 즉시 ack 여부 (기본값: config.SLACK_DROP_RETRIES)
+        """
+        self.app = app
+        secret = signing_secret if signing_secret is not None else config.SLACK_SIGNING_SECRET
+        if not secret:
+            logger.error("SLACK_SIGNING_SECRET is not set, all Slack requests will be rejected")
+        # 빈 키로 HMAC을 계산하면 누구나 서명을 만들 수 있으므로 secret이 없으면 검증 자체를 실패시킴
+        self.secret: Optional[bytes] = secret.encode('utf-8') if secret else None
+        self.path_prefix = path_prefix
+        self.retry_paths = frozenset(retry_paths)
+        self.drop_retries = config.SLACK_DROP_RETRIES if drop_retries is None else drop_retries
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'POST' or not scope['path'].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        timestamp = signature = retry_reason = None
+        is_retry = False
+        for name, value in scope['headers']:
+            if name == b'x-slack-request-timestamp':
+                timestamp = value
+            elif name == b'x-slack-signature':
+                signature = value
+            elif name == b'x-slack-retry-num':
+                is_retry = True
+            elif name == b'x-slack-retry-reason':
+                retry_reason = value
+
+        if is_retry and self.drop_retries and retry_reason in ACKED_RETRY_REASONS \
+                and scope['path'] in self.retry_paths:
+            metrics.inc('workbot_slack_edge_requests_total', outcome='retry_dropped')
+            await self._respond(send, 200, b'{"ok":true}', b'application/json', retry_ack=True)
+            return
+
+        if self.secret is None or not self._timestamp_fresh(timestamp) or signature is None:
+            metrics.inc('workbot_slack_edge_requests_total', outcome='rejected')
+            await self._respond(send, 401, b'invalid signature', b'text/plain')
+            return
+
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            chunks.append(message.get('body', b''))
+            more_body = message.get('more_body', False)
+        body = chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+        if not hmac.compare_digest(compute_signature(self.secret, timestamp, body), signature):
+            logger.warning(f"Rejected Slack request with invalid signature: {scope['path']}")
+            metrics.inc('workbot_slack_edge_requests_total', outcome='rejected')
+            await self._respond(send, 401, b'invalid signature', b'text/plain')
+            return
+
+        metrics.inc('workbot_slack_edge_requests_total', outcome='verified')
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            return await receive()
+
+        await self.app(scope, replay_receive, send)
+
+    @staticmethod
+    def _timestamp_fresh(timestamp: Optional[bytes]) -> bool:
+        if timestamp is None:
+            return False
+        try:
+            return abs(time.time() - int(timestamp)) <= MAX_TIMESTAMP_SKEW_SECONDS
+        except ValueError:
+            return False
+
+    @staticmethod
+    async def _respond(send, status: int, body: bytes, content_type: bytes, retry_ack: bool = False):
+        headers = [(b'content-type', content_type), (b'content-length', str(len(body)).encode('ascii'))]
+        if retry_ack:
+            headers.append((b'x-slack-no-retry', b'1'))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
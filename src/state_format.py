@@ -0,0 +1,111 @@
+"""
+처리 완료 메시지 상태의 DynamoDB 저장 포맷
+
+신규(compact) 포맷:
+    h   (B) 메시지 MD5 다이제스트 16바이트 (파티션 키)
+    ttl (N) 만료 시각 epoch 초 (처리 시각 = ttl - RECORD_TTL_SECONDS)
+    a   (B) 티켓 생성이 필요하다고 판단된 경우에만 zlib 압축된 분석 결과 JSON
+
+구(legacy) 포맷:
+    message_hash (S) MD5 hex, processed_at (S) ISO 시각, message_data (S) 원문+분석 JSON, ttl (N)
+
+중복 방지 마커로만 쓰이는 레코드가 대부분이므로 원문/부정 판정 분석은 저장하지 않습니다.
+"""
+import hashlib
+import json
+import math
+import time
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional
+
+RECORD_TTL_SECONDS = 86400
+
+KEY_ATTR = 'h'
+TTL_ATTR = 'ttl'
+ANALYSIS_ATTR = 'a'
+LEGACY_KEY_ATTR = 'message_hash'
+
+
+def message_digest(message: Dict) -> bytes:
+    """메시지의 16바이트 MD5 다이제스트를 생성합니다. (hex로 바꾸면 기존 message_hash와 동일)"""
+    content = f"{message['user']}_{message['text']}_{message['ts']}"
+    return hashlib.md5(content.encode()).digest()
+
+
+def is_positive(analysis: Optional[Dict]) -> bool:
+    """티켓 생성 승인 요청으로 이어진 분석 결과인지 판단합니다."""
+    return bool(analysis) and isinstance(analysis, dict) \
+        and analysis.get('need_ticket', False) and analysis.get('confidence', 0) > 0.5
+
+
+def encode_record(digest: bytes, analysis: Optional[Dict] = None, now: Optional[float] = None) -> Dict:
+    """compact 포맷 아이템을 생성합니다."""
+    now = time.time() if now is None else now
+    item = {KEY_ATTR: digest, TTL_ATTR: int(now) + RECORD_TTL_SECONDS}
+    if is_positive(analysis):
+        raw = json.dumps(analysis, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        item[ANALYSIS_ATTR] = zlib.compress(raw, 9)
+    return item
+
+
+def _raw_bytes(value) -> bytes:
+    # boto3 resource는 B 타입을 boto3.dynamodb.types.Binary로 감싸서 반환
+    return bytes(getattr(value, 'value', value))
+
+
+def decode_record(item: Dict) -> Dict:
+    """
+    신규/구 포맷 아이템을 같은 형태로 읽습니다.
+
+    Returns:
+        {'message_hash': hex, 'processed_at': epoch 초, 'analysis': dict 또는 None, 'legacy': bool}
+    """
+    if KEY_ATTR in item:
+        analysis = None
+        if ANALYSIS_ATTR in item:
+            analysis = json.loads(zlib.decompress(_raw_bytes(item[ANALYSIS_ATTR])).decode('utf-8'))
+        return {
+            'message_hash': _raw_bytes(item[KEY_ATTR]).hex(),
+            'processed_at': float(item[TTL_ATTR]) - RECORD_TTL_SECONDS,
+            'analysis': analysis,
+            'legacy': False
+        }
+    try:
+        message_data = json.loads(item.get('message_data') or '{}')
+    except ValueError:
+        message_data = {}
+    processed_at = item.get('processed_at')
+    return {
+        'message_hash': item[LEGACY_KEY_ATTR],
+        'processed_at': datetime.fromisoformat(processed_at).timestamp() if processed_at
+        else float(item.get('ttl', RECORD_TTL_SECONDS)) - RECORD_TTL_SECONDS,
+        'analysis': message_data.get('analysis'),
+        'legacy': True
+    }
+
+
+def _number_size(value) -> int:
+    # DynamoDB: 유효숫자 2자리당 1바이트 + 1바이트
+    digits = str(Decimal(value).normalize()).lstrip('-').replace('.', '').lstrip('0') or '0'
+    return math.ceil(len(digits) / 2) + 1
+
+
+def item_size(item: Dict) -> int:
+    """DynamoDB 아이템 크기 계산 규칙(속성 이름 + 값 바이트)으로 아이템 크기를 계산합니다."""
+    size = 0
+    for name, value in item.items():
+        size += len(name.encode('utf-8'))
+        if isinstance(value, str):
+            size += len(value.encode('utf-8'))
+        elif isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            size += _number_size(value)
+        else:
+            size += len(_raw_bytes(value))
+    return size
+
+
+def write_units(item: Dict) -> int:
+    """아이템 1건 쓰기에 소모되는 WCU (1KB 단위 올림)"""
+    return max(1, math.ceil(item_size(item) / 1024))
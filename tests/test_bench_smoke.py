@@ -0,0 +1,64 @@
+"""
+오프라인 벤치마크 스모크 테스트 (CI 회귀 검사)
+
+벤치 환경은 환경변수를 설정한 뒤 src.config를 처음 임포트해야 하므로 별도 프로세스로 실행합니다.
+"""
+import copy
+import json
+import os
+import subprocess
+import sys
+import pytest
+from bench.run import check_regressions
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, 'bench', 'baseline.json')
+
+
+def load_baseline():
+    with open(BASELINE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_bench_smoke_against_baseline():
+    pytest.importorskip('moto')
+    pytest.importorskip('httpx')
+    result = subprocess.run(
+        [sys.executable, '-m', 'bench.run', '--duration', '1', '--poll-iterations', '2', '--baseline', BASELINE],
+        cwd=ROOT, capture_output=True, text=True, timeout=300
+    )
+    regressions = [line for line in result.stderr.splitlines() if line.startswith('REGRESSION')]
+    assert result.returncode == 0, regressions or result.stderr[-2000:]
+
+
+def test_gate_flags_extra_upstream_calls():
+    baseline = load_baseline()
+    results = copy.deepcopy(baseline)
+    results['scenarios']['event']['upstream_calls']['openai']['chat.completions'] *= 2
+    failures = check_regressions(results, baseline, max_regression=0.25)
+    assert failures == [f"event: openai:chat.completions calls/request 2.00 > baseline 1.00"]
+
+
+def test_gate_flags_new_upstream_endpoint():
+    baseline = load_baseline()
+    results = copy.deepcopy(baseline)
+    results['scenarios']['retry']['upstream_calls']['openai']['chat.completions'] = 1
+    assert check_regressions(results, baseline, max_regression=0.25)
+
+
+def test_gate_ignores_small_absolute_latency_changes():
+    baseline = load_baseline()
+    results = copy.deepcopy(baseline)
+    for summary in results['scenarios'].values():
+        # 수 ms 단위 시나리오가 두 배로 느려져도 절대 허용치 안이면 통과
+        summary['p95_ms'] = summary['p95_ms'] * 2 if summary['p95_ms'] < 100 else summary['p95_ms']
+    assert check_regressions(results, baseline, max_regression=0.25, latency_floor_ms=250) == []
+    results['scenarios']['event']['p95_ms'] = baseline['scenarios']['event']['p95_ms'] + 500
+    assert len(check_regressions(results, baseline, max_regression=0.25, latency_floor_ms=250)) == 1
+
+
+def test_gate_flags_errors():
+    baseline = load_baseline()
+    results = copy.deepcopy(baseline)
+    results['scenarios']['interaction']['errors'] = 3
+    assert check_regressions(results, baseline, max_regression=0.25) == ['interaction: 3 failed requests']
@@ -0,0 +1,42 @@
+"""
+ChannelWorkers 테스트 (이벤트/인터랙션 처리가 실행되는 파티션별 워커)
+"""
+import logging
+import threading
+from src.metrics import metrics
+from src.routing import ChannelRoute, ChannelWorkers
+
+
+def error_count(partition: str) -> float:
+    return metrics.snapshot()['counters'].get('workbot_channel_task_errors_total', {}).get(f'{{channel="{partition}"}}', 0.0)
+
+
+def test_task_exception_is_logged_and_counted(caplog):
+    workers = ChannelWorkers()
+    route = ChannelRoute('CERR', 'SOM', concurrency=1, max_pending=2)
+    before = error_count('CERR')
+
+    def handle_interaction_payload(payload):
+        return payload['ticket_info']['summary']
+
+    with caplog.at_level(logging.ERROR, logger='src.routing'):
+        future = workers.submit(route, handle_interaction_payload, {})
+        future.exception(timeout=5)
+        workers.shutdown(wait=True)
+
+    assert error_count('CERR') == before + 1
+    assert 'handle_interaction_payload' in caplog.text and 'CERR' in caplog.text
+    assert workers.pending()['CERR'] == 0
+
+
+def test_queue_full_rejects_and_frees_slot():
+    workers = ChannelWorkers()
+    route = ChannelRoute('CFULL', 'SOM', concurrency=1, max_pending=1)
+    release = threading.Event()
+    first = workers.submit(route, release.wait, 5)
+    assert workers.submit(route, lambda: None) is None
+    release.set()
+    first.result(timeout=5)
+    workers.shutdown(wait=True)
+    assert workers.pending()['CFULL'] == 0
+    assert error_count('CFULL') == 0
@@ -0,0 +1,226 @@
+"""
+CircuitBreaker / RetryBudget / deadline 테스트 (모든 업스트림 호출이 거치는 계층)
+"""
+import time
+import pytest
+import requests
+from slack_sdk.errors import SlackApiError
+from src import resilience
+from src.resilience import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceeded, RetryBudget, deadline, remaining,
+    CLOSED, OPEN, HALF_OPEN
+)
+
+
+class Upstream:
+    def __init__(self, *results):
+        """호출될 때마다 results를 순서대로 반환하거나 (예외면) 발생시킵니다."""
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self, **kwargs):
+        self.calls += 1
+        result = self.results.pop(0) if self.results else 'ok'
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(resilience.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def make_breaker(**kwargs):
+    options = dict(failure_threshold=3, reset_timeout=60, max_retries=0, retry_budget_ratio=0.1)
+    options.update(kwargs)
+    return CircuitBreaker('test', **options)
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(ConnectionError):
+            breaker.call(Upstream(ConnectionError()))
+    assert breaker.state == OPEN
+
+
+def test_opens_at_failure_threshold():
+    breaker = make_breaker()
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(Upstream(ConnectionError()))
+        assert breaker.state == CLOSED
+    with pytest.raises(ConnectionError):
+        breaker.call(Upstream(ConnectionError()))
+    assert breaker.state == OPEN
+
+    upstream = Upstream()
+    with pytest.raises(CircuitOpenError):
+        breaker.call(upstream)
+    assert upstream.calls == 0
+
+
+def test_success_resets_consecutive_failures():
+    breaker = make_breaker()
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(Upstream(ConnectionError()))
+    assert breaker.call(Upstream('ok')) == 'ok'
+    with pytest.raises(ConnectionError):
+        breaker.call(Upstream(ConnectionError()))
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_single_probe(monkeypatch):
+    breaker = make_breaker()
+    open_breaker(breaker)
+    later = time.monotonic() + breaker.reset_timeout + 1
+    monkeypatch.setattr(resilience.time, 'monotonic', lambda: later)
+
+    assert breaker.allow() is True
+    assert breaker.state == HALF_OPEN
+    # 시험 호출이 진행 중인 동안에는 다른 호출을 막음
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens(monkeypatch):
+    breaker = make_breaker()
+    open_breaker(breaker)
+    later = time.monotonic() + breaker.reset_timeout + 1
+    monkeypatch.setattr(resilience.time, 'monotonic', lambda: later)
+    with pytest.raises(ConnectionError):
+        breaker.call(Upstream(ConnectionError()))
+    assert breaker.state == OPEN
+
+
+def test_client_error_releases_probe_without_counting(monkeypatch):
+    breaker = make_breaker(is_failure=lambda e: isinstance(e, ConnectionError))
+    open_breaker(breaker)
+    later = time.monotonic() + breaker.reset_timeout + 1
+    monkeypatch.setattr(resilience.time, 'monotonic', lambda: later)
+
+    with pytest.raises(ValueError):
+        breaker.call(Upstream(ValueError('bad request')))
+    assert breaker.state == HALF_OPEN
+    assert breaker.failures == breaker.failure_threshold
+    # 시험 슬롯이 반납되어 다음 호출이 가능해야 함
+    assert breaker.call(Upstream('ok')) == 'ok'
+    assert breaker.state == CLOSED
+
+
+def test_client_error_is_not_retried():
+    breaker = make_breaker(max_retries=3, is_failure=lambda e: isinstance(e, ConnectionError))
+    upstream = Upstream(ValueError('bad request'))
+    with pytest.raises(ValueError):
+        breaker.call(upstream)
+    assert upstream.calls == 1
+    assert breaker.failures == 0
+
+
+def test_idempotent_call_retries_until_success(no_sleep):
+    breaker = make_breaker(max_retries=2)
+    upstream = Upstream(ConnectionError(), ConnectionError(), 'ok')
+    assert breaker.call(upstream) == 'ok'
+    assert upstream.calls == 3
+    assert len(no_sleep) == 2
+
+
+def test_non_idempotent_call_is_not_retried():
+    breaker = make_breaker(max_retries=3)
+    upstream = Upstream(ConnectionError(), 'ok')
+    with pytest.raises(ConnectionError):
+        breaker.call(upstream, idempotent=False)
+    assert upstream.calls == 1
+
+
+def test_retries_stop_when_budget_is_empty():
+    breaker = make_breaker(max_retries=3)
+    breaker.budget.tokens = 1
+    upstream = Upstream(ConnectionError(), ConnectionError(), 'ok')
+    with pytest.raises(ConnectionError):
+        breaker.call(upstream)
+    assert upstream.calls == 2
+    assert breaker.budget.tokens == 0
+
+
+def test_retry_budget_refills_on_success():
+    budget = RetryBudget(ratio=0.5, max_tokens=2)
+    budget.tokens = 0
+    assert budget.withdraw() is False
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw() is True
+    for _ in range(10):
+        budget.deposit()
+    assert budget.tokens == 2
+
+
+def test_backoff_stops_at_deadline(monkeypatch, no_sleep):
+    breaker = make_breaker(max_retries=3)
+    monkeypatch.setattr(resilience.random, 'uniform', lambda low, high: high)
+    upstream = Upstream(ConnectionError(), 'ok')
+    with deadline(0.1):
+        with pytest.raises(ConnectionError):
+            breaker.call(upstream)
+    assert upstream.calls == 1
+    assert no_sleep == []
+
+
+def test_expired_deadline_skips_call():
+    breaker = make_breaker()
+    upstream = Upstream()
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            breaker.call(upstream)
+    assert upstream.calls == 0
+
+
+def test_timeout_kwarg_capped_by_remaining_deadline():
+    breaker = make_breaker()
+    seen = {}
+    with deadline(2):
+        breaker.call(lambda **kwargs: seen.update(kwargs), timeout_kwarg='timeout', default_timeout=10)
+    assert 0 < seen['timeout'] <= 2
+    breaker.call(lambda **kwargs: seen.update(kwargs), timeout_kwarg='timeout', default_timeout=10)
+    assert seen['timeout'] == 10
+
+
+def test_nested_deadline_keeps_shorter():
+    assert remaining() is None
+    with deadline(1):
+        with deadline(100):
+            assert remaining() <= 1
+        with deadline(None):
+            assert remaining() <= 1
+    assert remaining() is None
+
+
+@pytest.mark.parametrize('error, expected', [
+    (ConnectionResetError(), True),
+    (TimeoutError(), True),
+    (requests.exceptions.ConnectTimeout(), True),
+    (requests.exceptions.ConnectionError(), True),
+    (TypeError(), False),
+    (KeyError('ticket_info'), False),
+])
+def test_only_network_errors_count_as_upstream_failures(error, expected):
+    from src.slack_client import _is_upstream_failure as slack_failure
+    from src.jira_client import _is_upstream_failure as jira_failure
+    assert slack_failure(error) is expected
+    assert jira_failure(error) is expected
+
+
+def test_slack_api_errors_count_only_for_rate_limit_and_5xx():
+    from src.slack_client import _is_upstream_failure
+
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    assert _is_upstream_failure(SlackApiError('rate limited', Response(429))) is True
+    assert _is_upstream_failure(SlackApiError('server error', Response(503))) is True
+    assert _is_upstream_failure(SlackApiError('channel_not_found', Response(200))) is False
@@ -0,0 +1,120 @@
+"""
+SlackSignatureMiddleware 회귀 테스트 (엣지에서 유일한 보안 검사)
+"""
+import asyncio
+import time
+import pytest
+from src.slack_signature import SlackSignatureMiddleware, compute_signature
+
+SECRET = 'test-signing-secret'
+BODY = b'{"type":"event_callback","event_id":"Ev1"}'
+
+
+class DownstreamApp:
+    def __init__(self):
+        self.bodies = []
+
+    async def __call__(self, scope, receive, send):
+        message = await receive()
+        self.bodies.append(message['body'])
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b'ok'})
+
+
+def signed_headers(secret: str = SECRET, body: bytes = BODY, timestamp: int = None, **extra):
+    ts = str(int(time.time()) if timestamp is None else timestamp).encode('ascii')
+    headers = [
+        (b'x-slack-request-timestamp', ts),
+        (b'x-slack-signature', compute_signature(secret.encode('utf-8'), ts, body)),
+    ]
+    headers += [(name.replace('_', '-').lower().encode('ascii'), value.encode('ascii')) for name, value in extra.items()]
+    return headers
+
+
+def call(middleware, headers, body: bytes = BODY, path: str = '/slack/event', method: str = 'POST'):
+    scope = {'type': 'http', 'method': method, 'path': path, 'headers': headers}
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    start = sent[0]
+    return start['status'], dict(start['headers'])
+
+
+@pytest.fixture
+def app():
+    return DownstreamApp()
+
+
+def test_valid_signature_reaches_app(app):
+    status, _ = call(SlackSignatureMiddleware(app, signing_secret=SECRET), signed_headers())
+    assert status == 200
+    assert app.bodies == [BODY]
+
+
+def test_invalid_signature_rejected(app):
+    status, _ = call(SlackSignatureMiddleware(app, signing_secret=SECRET), signed_headers(secret='wrong'))
+    assert status == 401
+    assert app.bodies == []
+
+
+def test_tampered_body_rejected(app):
+    status, _ = call(SlackSignatureMiddleware(app, signing_secret=SECRET), signed_headers(), body=BODY + b' ')
+    assert status == 401
+    assert app.bodies == []
+
+
+def test_stale_timestamp_rejected(app):
+    headers = signed_headers(timestamp=int(time.time()) - 60 * 5 - 10)
+    status, _ = call(SlackSignatureMiddleware(app, signing_secret=SECRET), headers)
+    assert status == 401
+    assert app.bodies == []
+
+
+def test_missing_headers_rejected(app):
+    status, _ = call(SlackSignatureMiddleware(app, signing_secret=SECRET), [])
+    assert status == 401
+
+
+def test_empty_secret_rejects_everything(app):
+    # 빈 키로 서명한 요청도 통과하면 안 됨
+    middleware = SlackSignatureMiddleware(app, signing_secret='')
+    status, _ = call(middleware, signed_headers(secret=''))
+    assert status == 401
+    status, _ = call(middleware, signed_headers(secret=''), path='/slack/interactions')
+    assert status == 401
+    assert app.bodies == []
+
+
+def test_unprotected_paths_pass_through(app):
+    middleware = SlackSignatureMiddleware(app, signing_secret='')
+    assert call(middleware, [], path='/health', method='GET')[0] == 200
+    assert call(middleware, [], path='/slack/event', method='GET')[0] == 200
+
+
+def test_http_timeout_retry_acked_without_app(app):
+    headers = signed_headers(x_slack_retry_num='1', x_slack_retry_reason='http_timeout')
+    status, response_headers = call(SlackSignatureMiddleware(app, signing_secret=SECRET, drop_retries=True), headers)
+    assert status == 200
+    assert response_headers[b'x-slack-no-retry'] == b'1'
+    assert app.bodies == []
+
+
+@pytest.mark.parametrize('reason', ['http_error', 'connection_failed', 'ssl_error', 'unknown'])
+def test_failure_retry_verified_and_forwarded(app, reason):
+    middleware = SlackSignatureMiddleware(app, signing_secret=SECRET, drop_retries=True)
+    headers = signed_headers(x_slack_retry_num='1', x_slack_retry_reason=reason)
+    status, response_headers = call(middleware, headers)
+    assert status == 200
+    assert b'x-slack-no-retry' not in response_headers
+    assert app.bodies == [BODY]
+
+    forged = signed_headers(secret='wrong', x_slack_retry_num='1', x_slack_retry_reason=reason)
+    assert call(middleware, forged)[0] == 401
+    assert app.bodies == [BODY]
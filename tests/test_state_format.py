@@ -0,0 +1,85 @@
+"""
+state_format 인코딩/디코딩 테스트 (신규 compact 포맷과 구 포맷 레코드를 함께 읽는 경로)
+"""
+import json
+import zlib
+from datetime import datetime
+from boto3.dynamodb.types import Binary
+from src.state_format import (
+    RECORD_TTL_SECONDS, KEY_ATTR, TTL_ATTR, ANALYSIS_ATTR, LEGACY_KEY_ATTR,
+    message_digest, encode_record, decode_record
+)
+
+NOW = 1718000000
+MESSAGE = {'user': 'U1', 'text': '결제 후 재매칭권이 차감되지 않아요', 'ts': '1718000000.000100'}
+POSITIVE = {
+    'need_ticket': True,
+    'confidence': 0.9,
+    'reasoning': '결제 데이터 무결성 문제',
+    'ticket_info': {'summary': '[버그] 재매칭권 차감 누락', 'issue_type': '버그'}
+}
+NEGATIVE = {'need_ticket': False, 'confidence': 0.2, 'reasoning': '일상 대화', 'ticket_info': None}
+
+
+def test_compact_round_trip():
+    digest = message_digest(MESSAGE)
+    item = encode_record(digest, POSITIVE, now=NOW)
+    assert item[TTL_ATTR] == NOW + RECORD_TTL_SECONDS
+    assert json.loads(zlib.decompress(item[ANALYSIS_ATTR])) == POSITIVE
+
+    record = decode_record(item)
+    assert record == {
+        'message_hash': digest.hex(),
+        'processed_at': float(NOW),
+        'analysis': POSITIVE,
+        'legacy': False
+    }
+
+
+def test_compact_round_trip_through_boto3_binary():
+    # boto3 resource는 B 타입을 Binary로 감싸서 반환
+    item = encode_record(message_digest(MESSAGE), POSITIVE, now=NOW)
+    stored = {name: Binary(value) if isinstance(value, bytes) else value for name, value in item.items()}
+    assert decode_record(stored) == decode_record(item)
+
+
+def test_negative_analysis_drops_analysis_attribute():
+    item = encode_record(message_digest(MESSAGE), NEGATIVE, now=NOW)
+    assert ANALYSIS_ATTR not in item
+    assert set(item) == {KEY_ATTR, TTL_ATTR}
+    assert decode_record(item)['analysis'] is None
+
+
+def test_low_confidence_analysis_is_not_stored():
+    analysis = dict(POSITIVE, confidence=0.5)
+    assert ANALYSIS_ATTR not in encode_record(message_digest(MESSAGE), analysis, now=NOW)
+
+
+def test_legacy_item():
+    message_hash = message_digest(MESSAGE).hex()
+    processed_at = datetime.fromtimestamp(NOW).isoformat()
+    item = {
+        LEGACY_KEY_ATTR: message_hash,
+        'processed_at': processed_at,
+        'message_data': json.dumps({'message': MESSAGE, 'analysis': POSITIVE}, ensure_ascii=False),
+        'ttl': NOW + RECORD_TTL_SECONDS
+    }
+    assert decode_record(item) == {
+        'message_hash': message_hash,
+        'processed_at': float(NOW),
+        'analysis': POSITIVE,
+        'legacy': True
+    }
+
+
+def test_legacy_item_with_malformed_message_data():
+    item = {
+        LEGACY_KEY_ATTR: 'ab' * 16,
+        'message_data': '{"message": ',
+        'ttl': NOW + RECORD_TTL_SECONDS
+    }
+    record = decode_record(item)
+    assert record['analysis'] is None
+    assert record['legacy'] is True
+    # processed_at이 없으면 ttl에서 역산
+    assert record['processed_at'] == float(NOW)